@@ -7,6 +7,9 @@ from alembic import context
 
 from src.db.db import Base
 from src.models.user import User 
+from src.models.prediction import Prediction
+from src.models.syllabus import Syllabus
+from src.models.paper_digest import PaperDigest, PaperUpload
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
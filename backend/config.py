@@ -14,4 +14,17 @@ if not JWT_SECRET_KEY:
 JWT_ALGORITHM= os.getenv("JWT_ALGORITHM", "HS256")
 JWT_ACCESS_TOKEN_EXPIRE_MINUTES= int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
\ No newline at end of file
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+# Admission control for the /ai endpoints
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", 4))
+AI_MAX_QUEUE = int(os.getenv("AI_MAX_QUEUE", 16))
+AI_QUEUE_TIMEOUT_SECONDS = float(os.getenv("AI_QUEUE_TIMEOUT_SECONDS", 30))
+AI_LIGHT_RESERVED_SLOTS = int(os.getenv("AI_LIGHT_RESERVED_SLOTS", 1))
+AI_PER_USER_CONCURRENCY = int(os.getenv("AI_PER_USER_CONCURRENCY", 2))
+AI_PER_USER_REQUESTS_PER_HOUR = int(os.getenv("AI_PER_USER_REQUESTS_PER_HOUR", 30))
+AI_HEAVY_UPLOAD_BYTES = int(os.getenv("AI_HEAVY_UPLOAD_BYTES", 2 * 1024 * 1024))
+# Threads for long-running AI work, kept off the default executor so short
+# to_thread calls (saving/fetching predictions) never queue behind it
+AI_WORKER_THREADS = int(os.getenv("AI_WORKER_THREADS", 8))
+AI_FILE_PIPELINE_THREADS = int(os.getenv("AI_FILE_PIPELINE_THREADS", 4))
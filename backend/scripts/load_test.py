@@ -0,0 +1,145 @@
+"""
+Local load test for the /ai admission control.
+
+Simulates an LLM backend whose latency degrades once more calls run than its
+rate limit allows, then drives many concurrent clients against two in-process
+apps: one without admission control and one guarded by AdmissionController.
+Nothing leaves the machine; no database or API key is needed.
+
+    cd backend
+    python scripts/load_test.py --clients 60 --duration 15
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+from fastapi import FastAPI, Header
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.admission import AdmissionController, AdmissionRejected, HEAVY, LIGHT
+
+
+class SimulatedLLM:
+    """Each call takes `base` seconds, stretched proportionally once `capacity` calls overlap."""
+
+    def __init__(self, capacity: int, base: float):
+        self.capacity = capacity
+        self.base = base
+        self.inflight = 0
+
+    async def call(self):
+        self.inflight += 1
+        try:
+            await asyncio.sleep(self.base * max(1.0, self.inflight / self.capacity))
+        finally:
+            self.inflight -= 1
+
+
+def build_app(llm: SimulatedLLM, controller: AdmissionController | None, heavy_calls: int) -> FastAPI:
+    app = FastAPI()
+
+    async def work(lane: str):
+        for _ in range(heavy_calls if lane == HEAVY else 1):
+            await llm.call()
+
+    @app.post("/work/{lane}")
+    async def handle(lane: str, x_user: int = Header()):
+        if controller is None:
+            await work(lane)
+            return {"ok": True}
+        try:
+            async with controller.slot(x_user, lane):
+                await work(lane)
+        except AdmissionRejected as e:
+            return JSONResponse({"detail": e.detail}, status_code=429, headers={"Retry-After": str(e.retry_after)})
+        return {"ok": True}
+
+    return app
+
+
+async def run_clients(app: FastAPI, args) -> dict:
+    results = defaultdict(lambda: {"latencies": [], "rejected": 0})
+    deadline = time.monotonic() + args.duration
+    transport = httpx.ASGITransport(app=app)
+
+    async def client(n: int):
+        user = n % args.users
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as http:
+            while time.monotonic() < deadline:
+                lane = HEAVY if random.random() < args.heavy_ratio else LIGHT
+                started = time.monotonic()
+                response = await http.post(f"/work/{lane}", headers={"x-user": str(user)})
+                if response.status_code == 429:
+                    results[lane]["rejected"] += 1
+                    # Honour Retry-After, capped so the test keeps pushing load
+                    await asyncio.sleep(min(float(response.headers.get("retry-after", 1)), 1.0))
+                    continue
+                results[lane]["latencies"].append(time.monotonic() - started)
+
+    await asyncio.gather(*(client(n) for n in range(args.clients)))
+    return results
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def report(title: str, results: dict, duration: float):
+    print(f"\n== {title}")
+    print(f"{'lane':<6} {'ok':>6} {'429':>6} {'rps':>6} {'p50':>7} {'p95':>7} {'p99':>7}")
+    for lane in (LIGHT, HEAVY):
+        latencies = results[lane]["latencies"]
+        print(
+            f"{lane:<6} {len(latencies):>6} {results[lane]['rejected']:>6} "
+            f"{len(latencies) / duration:>6.1f} "
+            f"{percentile(latencies, 0.50):>6.2f}s {percentile(latencies, 0.95):>6.2f}s "
+            f"{percentile(latencies, 0.99):>6.2f}s"
+        )
+    if latencies := results[LIGHT]["latencies"] + results[HEAVY]["latencies"]:
+        print(f"latency stdev: {statistics.pstdev(latencies):.2f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=60, help="concurrent clients")
+    parser.add_argument("--users", type=int, default=30, help="distinct user IDs shared by the clients")
+    parser.add_argument("--duration", type=float, default=15, help="seconds per scenario")
+    parser.add_argument("--heavy-ratio", type=float, default=0.3, help="fraction of heavy (big PDF) requests")
+    parser.add_argument("--heavy-calls", type=int, default=5, help="LLM calls per heavy request")
+    parser.add_argument("--llm-capacity", type=int, default=4, help="concurrent LLM calls before slowdown")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per LLM call when not overloaded")
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument("--max-queue", type=int, default=8)
+    parser.add_argument("--queue-timeout", type=float, default=5)
+    parser.add_argument("--light-reserved", type=int, default=1)
+    parser.add_argument("--per-user", type=int, default=2)
+    args = parser.parse_args()
+
+    unguarded = build_app(SimulatedLLM(args.llm_capacity, args.llm_latency), None, args.heavy_calls)
+    report("without admission control", await run_clients(unguarded, args), args.duration)
+
+    controller = AdmissionController(
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        queue_timeout=args.queue_timeout,
+        light_reserved=args.light_reserved,
+        per_user_concurrency=args.per_user,
+    )
+    guarded = build_app(SimulatedLLM(args.llm_capacity, args.llm_latency), controller, args.heavy_calls)
+    report("with admission control", await run_clients(guarded, args), args.duration)
+    print(controller.stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Train the local page classifier from LLM-labelled pages.
+
+Pages are recorded to PAGE_LABELS_PATH while the server runs with
+RECORD_PAGE_LABELS=true. This trains a hashed n-gram logistic regression on
+them, reports holdout accuracy and how many pages it would answer without the
+LLM, and saves it as the next version in PAGE_CLASSIFIER_DIR. A running server
+picks the new version up automatically.
+
+    cd backend
+    python scripts/train_page_classifier.py
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agents.local_classifier import (
+    LOCAL_CLASSIFIER_THRESHOLD, PAGE_CLASSIFIER_DIR, PAGE_LABELS_PATH,
+    LocalPageClassifier, evaluate, load_labelled_pages, save_model,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labels", default=PAGE_LABELS_PATH, help="recorded labels (JSONL)")
+    parser.add_argument("--model-dir", default=PAGE_CLASSIFIER_DIR, help="where model versions are saved")
+    parser.add_argument("--epochs", type=int, default=15)
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction of pages kept for evaluation")
+    parser.add_argument("--threshold", type=float, default=LOCAL_CLASSIFIER_THRESHOLD)
+    parser.add_argument("--min-accuracy", type=float, default=0.97,
+                        help="do not save unless holdout accuracy on confident pages reaches this")
+    parser.add_argument("--dry-run", action="store_true", help="evaluate without saving")
+    args = parser.parse_args()
+
+    samples = load_labelled_pages(args.labels)
+    labels = {label for _, label in samples}
+    if len(samples) < 20 or len(labels) < 2:
+        sys.exit(f"Need at least 20 pages covering both labels, found {len(samples)} ({', '.join(sorted(labels)) or 'none'}).")
+
+    random.Random(7).shuffle(samples)
+    split = max(1, int(len(samples) * args.holdout))
+    test, train = samples[:split], samples[split:]
+    print(f"Training on {len(train)} pages, evaluating on {len(test)}")
+
+    started = time.perf_counter()
+    model = LocalPageClassifier.train(train, epochs=args.epochs)
+    print(f"Trained in {time.perf_counter() - started:.2f}s ({len(model.weights)} non-zero weights)")
+
+    metrics = evaluate(model, test, args.threshold)
+    print(f"Holdout: {metrics}")
+
+    started = time.perf_counter()
+    for text, _ in test:
+        model.predict(text)
+    print(f"Latency: {(time.perf_counter() - started) / len(test) * 1e6:.0f} µs/page")
+
+    if args.dry_run:
+        return
+    if (metrics["accuracy_when_confident"] or 0) < args.min_accuracy:
+        sys.exit(f"Not saving: accuracy on confident pages is below {args.min_accuracy}")
+
+    # Final model is trained on everything we have
+    model = LocalPageClassifier.train(samples, epochs=args.epochs)
+    model.meta = {"samples": len(samples), "holdout": metrics, "threshold": args.threshold,
+                  "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    path = save_model(model, args.model_dir)
+    print(f"Saved v{model.version} to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
-from typing import Literal
-from litellm import completion
+from typing import Collection, List, Literal, Optional, Tuple
 from pdfminer.high_level import extract_pages
 from pdfminer.layout import LTTextContainer
+from pdfminer.pdfpage import PDFPage
+from pdfminer.utils import open_filename
 import os
+import re
+import json
 from dotenv import load_dotenv
+from src.agents.llm import complete
 
 load_dotenv()
 
@@ -64,39 +68,105 @@ def classify_chunk_with_llm(text: str) -> Literal["question_paper", "syllabus"]:
     Classification:
     """
 
-    response = completion(
-        model="groq/gemma2-9b-it",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.0,
-        stream=False
-    )
-
-    output = response.choices[0].message["content"].strip().lower()     #type:ignore
+    output = complete(prompt, temperature=0.0).strip().lower()
     return output
         
     
-def split_pdf_by_classification(pdf_path: str):
-    question_pages = []
-    syllabus_pages = []
+SYLLABUS_CUES = [
+    re.compile(p, re.IGNORECASE) for p in (
+        r"\bunit\s*[-:]?\s*(?:[ivx]+|\d+)\b", r"course\s+outcomes?", r"text\s*books?", r"reference\s+books?",
+        r"learning\s+objectives?", r"\bsyllabus\b", r"\bmodule\s*[-:]?\s*\d+", r"\blectures?\b", r"\bprerequisites?\b",
+    )
+]
+QUESTION_CUES = [
+    re.compile(p, re.IGNORECASE | re.MULTILINE) for p in (
+        r"^\s*q(?:uestion)?\s*\.?\s*\d+", r"max(?:imum)?\.?\s*marks", r"\btime\s*[:\-]\s*\d", r"\battempt\b",
+        r"answer\s+any", r"\bsection\s*[-:]?\s*[a-e]\b", r"\[\s*\d+\s*marks?\s*\]", r"\broll\s+no\b",
+    )
+]
+
+
+def heuristic_classify(text: str) -> Tuple[str, float]:
+    """Keyword-based page label with a rough confidence in [0, 1); no LLM call."""
+    syllabus = sum(len(p.findall(text)) for p in SYLLABUS_CUES)
+    question = sum(len(p.findall(text)) for p in QUESTION_CUES)
+    label = "syllabus" if syllabus > question else "question_paper"
+    return label, abs(syllabus - question) / (syllabus + question + 1)
+
+
+PAGE_LABELS = ("question_paper", "syllabus")
+
+
+def classify_pages_with_llm(texts: List[str], max_chars: int = 1500) -> Tuple[List[str], List[bool]]:
+    """
+    Classify several pages with a single LLM call. Returns the labels and, per
+    page, whether the label really came from the LLM; pages it did not answer
+    (failed call, bad JSON, wrong length or an unknown label) fall back to heuristics.
+    """
+    if not texts:
+        return [], []
+    pages = "\n\n".join(f"### Page {i+1}\n{text[:max_chars]}" for i, text in enumerate(texts))
+    prompt = f"""
+    You are a strict academic document classifier.
+    Classify each page below as either "question_paper" or "syllabus".
+    Return ONLY a JSON array with one label per page, in page order, e.g. ["syllabus", "question_paper"].
 
-    for i, page_layout in enumerate(extract_pages(pdf_path)):
+    {pages}
+    """
+
+    answers: List[Optional[str]] = [None] * len(texts)
+    try:
+        output = complete(prompt, temperature=0.0).strip()
+        output = re.sub(r"^```(?:json)?\s*|```$", "", output, flags=re.IGNORECASE).strip()
+        labels = json.loads(output)
+        if isinstance(labels, list) and len(labels) == len(texts):
+            answers = [str(label).strip().lower() for label in labels]
+        else:
+            print(f"⚠️ Batch classification returned {len(labels) if isinstance(labels, list) else 'no'} labels for {len(texts)} pages")
+    except Exception as e:
+        print(f"⚠️ Batch classification failed: {e}")
+
+    from_llm = [answer in PAGE_LABELS for answer in answers]
+    labels = [answer if ok else heuristic_classify(text)[0] for answer, ok, text in zip(answers, from_llm, texts)]
+    return labels, from_llm      #type: ignore
+
+
+def _rewind(pdf):
+    # The same in-memory PDF is read more than once
+    if hasattr(pdf, "seek"):
+        pdf.seek(0)
+
+
+def count_pages(pdf) -> int:
+    """Number of pages, read from the page tree without any layout analysis."""
+    _rewind(pdf)
+    with open_filename(pdf, "rb") as fp:
+        return sum(1 for _ in PDFPage.get_pages(fp))
+
+
+def extract_page_texts(pdf, page_numbers: Optional[Collection[int]] = None) -> List[str]:
+    """
+    Return the text of every page in the PDF (path or file-like object), or
+    only of `page_numbers` (0-based, in page order); other pages are not laid out.
+    """
+    _rewind(pdf)
+    pages = []
+    for page_layout in extract_pages(pdf, page_numbers=page_numbers):
         # Concatenate text from all containers (blocks) on this page
         text = ""
         for element in page_layout:
             if isinstance(element, LTTextContainer):
                 text += element.get_text()
-        text = text.strip()
+        pages.append(text.strip())
+    return pages
 
-        print(f"\n🔍 Classifying Page {i+1}...")
-        tag = classify_chunk_with_llm(text)
-        print(f"🧠 LLM says: {tag}")
 
-        if tag == "syllabus":
-            syllabus_pages.append(text)
-        else:
-            question_pages.append(text)
+def split_pdf_by_classification(pdf_path: str):
+    # Same streaming pipeline as the API; imported here because it imports this module
+    from src.agents.pipeline import run_pipeline
+    result = run_pipeline(pdf_path)
 
     return {
-        "question_papers": "\n\n".join(question_pages),
-        "syllabus": "\n\n".join(syllabus_pages)
-    }
\ No newline at end of file
+        "question_papers": result["question_papers"],
+        "syllabus": result["syllabus"]
+    }
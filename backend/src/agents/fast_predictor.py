@@ -0,0 +1,202 @@
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.agents.classifier import count_pages, extract_page_texts, heuristic_classify, classify_pages_with_llm
+from src.agents.local_classifier import LOCAL_CLASSIFIER_THRESHOLD, get_model, record_page_label
+from src.agents.pipeline import PAPER_HEADER, PAPER_HEADER_CHARS
+from src.agents.question_parser import QUESTION_START, split_questions, question_marks
+from src.agents.syllabus_index import tokenize
+
+FAST_SAMPLE_PAGES = 8
+# Sampled pages whose keyword label is less certain than this go to the (single) LLM call
+FAST_MIN_CONFIDENCE = 0.5
+# Upper bound on extra pages read to complete a sampled syllabus block
+FAST_MAX_SYLLABUS_PAGES = 24
+
+MAX_MARKS = re.compile(r"max(?:imum)?\.?\s*marks?\s*[:\-]?\s*(\d{2,3})", re.IGNORECASE)
+DURATION = re.compile(r"time\s*(?:allowed)?\s*[:\-]?\s*(\d+(?:\.\d+)?\s*(?:hours?|hrs?|minutes?|mins?))", re.IGNORECASE)
+SECTION = re.compile(r"^\s*(?:section|part)\s*[-:]?\s*([a-e]|[ivx]+)\b", re.IGNORECASE | re.MULTILINE)
+MCQ_OPTIONS = re.compile(r"\(\s*[a-d]\s*\).*\(\s*[b-d]\s*\)", re.IGNORECASE | re.DOTALL)
+
+
+def sample_page_indexes(n_pages: int, k: int = FAST_SAMPLE_PAGES) -> List[int]:
+    """Evenly spaced page indexes, always including the first and last page."""
+    if n_pages <= k:
+        return list(range(n_pages))
+    return sorted({round(i * (n_pages - 1) / (k - 1)) for i in range(k)})
+
+
+def _local_label(model, text: str) -> Tuple[str, bool]:
+    # Trained local model first, keyword heuristics as the fallback
+    if model is not None:
+        label, confidence = model.predict(text)
+        if confidence >= LOCAL_CLASSIFIER_THRESHOLD:
+            return label, True
+    label, confidence = heuristic_classify(text)
+    return label, confidence >= FAST_MIN_CONFIDENCE
+
+
+def _expand_syllabus_pages(pdf, n_pages: int, labels: Dict[int, str], texts: Dict[int, str], model):
+    """
+    Grow each sampled syllabus page into its whole block of neighbouring
+    syllabus pages (labelled locally), so the syllabus text matches the one
+    stored by full runs of the same PDF.
+    """
+    budget = FAST_MAX_SYLLABUS_PAGES
+    while budget > 0:
+        frontier = sorted({
+            j for i, label in labels.items() if label == "syllabus"
+            for j in (i - 1, i + 1) if 0 <= j < n_pages and j not in labels
+        })[:budget]
+        if not frontier:
+            return
+        budget -= len(frontier)
+        for j, text in zip(frontier, extract_page_texts(pdf, frontier)):
+            texts[j] = text
+            labels[j] = _local_label(model, text)[0]
+
+
+def classify_sampled_pages(pdf, k: int = FAST_SAMPLE_PAGES) -> Dict[str, Any]:
+    """
+    Classify a sample of pages locally, using at most one batched LLM call for
+    unsure pages. Only sampled pages (and the rest of any sampled syllabus
+    block) are laid out.
+    """
+    n_pages = count_pages(pdf)
+    sampled = sample_page_indexes(n_pages, k)
+    texts = dict(zip(sampled, extract_page_texts(pdf, sampled)))
+
+    model = get_model()
+    labels: Dict[int, str] = {}
+    unsure = []
+    for i in sampled:
+        labels[i], confident = _local_label(model, texts[i])
+        if not confident:
+            unsure.append(i)
+    if unsure:
+        llm_labels, from_llm = classify_pages_with_llm([texts[i] for i in unsure])
+        for i, label, answered in zip(unsure, llm_labels, from_llm):
+            labels[i] = label
+            # Heuristic fallbacks for these unsure pages must not become training data
+            if answered:
+                record_page_label(texts[i], label)
+
+    _expand_syllabus_pages(pdf, n_pages, labels, texts, model)
+
+    return {
+        "question_pages": [texts[i] for i in sampled if labels[i] != "syllabus"],
+        "syllabus_pages": [texts[i] for i in sorted(labels) if labels[i] == "syllabus"],
+        "total_pages": n_pages,
+        "sampled_pages": len(sampled),
+        "extracted_pages": len(texts),
+    }
+
+
+def segment_papers(question_pages: List[str]) -> List[str]:
+    """Group consecutive question pages into papers, starting a new one at each session header."""
+    papers: List[List[str]] = []
+    for text in question_pages:
+        if not papers or PAPER_HEADER.search(text[:PAPER_HEADER_CHARS]):
+            papers.append([])
+        papers[-1].append(text)
+    return ["\n\n".join(pages) for pages in papers]
+
+
+def _question_type(question: str, marks: Optional[int]) -> str:
+    if MCQ_OPTIONS.search(question):
+        return "mcq"
+    if marks is None:
+        return "unspecified"
+    return "short_answer" if marks <= 5 else "long_answer"
+
+
+def paper_statistics(papers: List[str]) -> Dict[str, Any]:
+    """Marks, section and question-type statistics of past papers, computed without the LLM."""
+    max_marks = Counter()
+    durations = Counter()
+    marks = Counter()
+    types = Counter()
+    sections: Dict[str, Counter] = {}
+    terms = Counter()
+
+    for paper in papers:
+        if m := MAX_MARKS.search(paper):
+            max_marks[int(m.group(1))] += 1
+        if m := DURATION.search(paper):
+            durations[m.group(1).lower()] += 1
+
+        # Attribute each question to the last section header before it
+        headers = [(h.start(), h.group(1).upper()) for h in SECTION.finditer(paper)]
+        offset = 0
+        for question in split_questions(paper):
+            offset = paper.find(question, offset)
+            section = next((name for pos, name in reversed(headers) if pos <= offset), "General")
+            q_marks = question_marks(question)
+            q_type = _question_type(question, q_marks)
+            types[q_type] += 1
+            if q_marks is not None:
+                marks[q_marks] += 1
+            stats = sections.setdefault(section, Counter())
+            stats["questions"] += 1
+            stats["marks"] += q_marks or 0
+            stats[q_type] += 1
+            # Count each term once per question so long answers don't dominate
+            terms.update(set(tokenize(QUESTION_START.sub("", question, count=1))))
+
+    n_papers = max(len(papers), 1)
+    return {
+        "papers": len(papers),
+        "max_marks": max_marks.most_common(1)[0][0] if max_marks else None,
+        "duration": durations.most_common(1)[0][0] if durations else None,
+        "question_types": dict(types),
+        "marks_per_question": {str(k): v for k, v in sorted(marks.items())},
+        "sections": [
+            {
+                "section": name,
+                "avg_questions": round(stats["questions"] / n_papers, 1),
+                "avg_marks": round(stats["marks"] / n_papers, 1),
+                "question_types": {t: stats[t] for t in ("mcq", "short_answer", "long_answer", "unspecified") if stats[t]},
+            }
+            for name, stats in sorted(sections.items())
+        ],
+        "frequent_terms": [term for term, _ in terms.most_common(15)],
+    }
+
+
+def predict_structure_locally(papers: List[str], syllabus_stats: Optional[dict] = None, has_syllabus: bool = False) -> dict:
+    """Predict the next paper's structure from local statistics only, in the shape of format_prediction_response."""
+    stats = paper_statistics(papers)
+
+    if syllabus_stats and syllabus_stats.get("units"):
+        ranked = sorted(syllabus_stats["units"], key=lambda u: (u["marks_share"], u["questions"]), reverse=True)
+        topics = [u["unit"] for u in ranked if u["questions"]]
+        new_topics = syllabus_stats.get("never_asked_units", [])
+    else:
+        topics = stats["frequent_terms"]
+        new_topics = []
+
+    total_types = sum(stats["question_types"].values()) or 1
+    summary = f"{len(stats['sections']) or 1} section(s)"
+    if stats["max_marks"]:
+        summary += f", {stats['max_marks']} marks"
+    if stats["duration"]:
+        summary += f", {stats['duration']}"
+
+    return {
+        "prediction": f"Expected format: {summary} (estimated from past papers without AI analysis)",
+        "raw_output": stats,
+        "likely_question_types_and_distribution": {
+            t: round(count / total_types, 2) for t, count in stats["question_types"].items()
+        },
+        "topics_most_likely_to_appear": topics[:10],
+        "estimated_marks_distribution": {
+            s["section"]: s["avg_marks"] for s in stats["sections"]
+        },
+        "sections_structure": stats["sections"],
+        "difficulty_level_expectations": "",
+        "new_topics_that_might_be_introduced": new_topics,
+        "pattern_analysis_and_recommendations": "",
+        "input_papers": len(papers),
+        "has_syllabus": has_syllabus,
+    }
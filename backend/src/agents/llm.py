@@ -0,0 +1,94 @@
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from dotenv import load_dotenv
+from litellm import completion
+
+from src.utils.singleflight import SingleFlight
+
+load_dotenv()
+
+MODEL = "groq/gemma2-9b-it"
+
+# Process-wide cap on LLM requests in flight. Admission control holds one slot
+# per HTTP request, but a single batch fans out into many pipelines and worker
+# threads; this keeps their combined calls under the provider's rate limit.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+_llm_slots = threading.BoundedSemaphore(max(1, LLM_MAX_CONCURRENCY))
+_llm_stats_lock = threading.Lock()
+_llm_stats = {"active": 0, "waiting": 0, "peak_active": 0}
+
+# Identical prompts issued while one is still running share that one call
+llm_flight = SingleFlight()
+
+
+class LLMCallCounter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def add(self):
+        with self._lock:
+            self.value += 1
+
+
+_call_counter: ContextVar[Optional[LLMCallCounter]] = ContextVar("llm_call_counter", default=None)
+
+
+@contextmanager
+def count_llm_calls() -> Iterator[LLMCallCounter]:
+    """Count the LLM calls made in this context (including copied contexts in worker threads)."""
+    counter = LLMCallCounter()
+    token = _call_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _call_counter.reset(token)
+
+
+def _complete(prompt: str, temperature: float, model: str) -> str:
+    with _llm_stats_lock:
+        _llm_stats["waiting"] += 1
+    _llm_slots.acquire()
+    with _llm_stats_lock:
+        _llm_stats["waiting"] -= 1
+        _llm_stats["active"] += 1
+        _llm_stats["peak_active"] = max(_llm_stats["peak_active"], _llm_stats["active"])
+    try:
+        response = completion(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            stream=False,
+        )
+    finally:
+        with _llm_stats_lock:
+            _llm_stats["active"] -= 1
+        _llm_slots.release()
+    return getattr(response.choices[0].message, "content", "") or ""     #type: ignore
+
+
+def llm_stats() -> dict:
+    with _llm_stats_lock:
+        return {**_llm_stats, "max_concurrency": LLM_MAX_CONCURRENCY}
+
+
+def prompt_fingerprint(prompt: str, temperature: float, model: str = MODEL) -> str:
+    return hashlib.sha256(f"{model}\0{temperature}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+def complete(prompt: str, temperature: float = 0.2, model: str = MODEL) -> str:
+    """Run a single-message completion and return the message text."""
+    def call() -> str:
+        # Only the caller that actually hits the provider counts the call;
+        # coalesced followers share its result for free
+        counter = _call_counter.get()
+        if counter is not None:
+            counter.add()
+        return _complete(prompt, temperature, model)
+
+    key = prompt_fingerprint(prompt, temperature, model)
+    return llm_flight.do(key, call)
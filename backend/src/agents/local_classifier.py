@@ -0,0 +1,262 @@
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from src.agents.classifier import PAGE_LABELS, classify_chunk_with_llm
+
+load_dotenv()
+
+PAGE_CLASSIFIER_DIR = os.getenv("PAGE_CLASSIFIER_DIR", "page_classifier")
+PAGE_LABELS_PATH = os.getenv("PAGE_LABELS_PATH", os.path.join(PAGE_CLASSIFIER_DIR, "labels.jsonl"))
+RECORD_PAGE_LABELS = os.getenv("RECORD_PAGE_LABELS", "false").lower() in ("1", "true", "yes")
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", 0.9))
+
+N_FEATURES = 2 ** 18
+MAX_FEATURE_CHARS = 4000
+RELOAD_CHECK_SECONDS = 30
+
+TOKEN = re.compile(r"[a-z]+|\d+")
+
+_record_lock = threading.Lock()
+_model_lock = threading.Lock()
+_model: Optional["LocalPageClassifier"] = None
+_model_version: Optional[int] = None
+_model_checked_at = 0.0
+_counters_lock = threading.Lock()
+_counters = {"local": 0, "llm": 0}
+
+
+def normalize_label(label: str) -> str:
+    return "syllabus" if "syllabus" in (label or "").lower() else "question_paper"
+
+
+def hashed_features(text: str, n_features: int = N_FEATURES) -> Dict[int, float]:
+    """Hashed word unigram + bigram features, sublinear tf, L2-normalised."""
+    tokens = [t if not t.isdigit() else "<num>" for t in TOKEN.findall(text[:MAX_FEATURE_CHARS].lower())]
+    grams = Counter(tokens)
+    grams.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    features: Dict[int, float] = {}
+    for gram, tf in grams.items():
+        index = zlib.crc32(gram.encode("utf-8")) % n_features
+        features[index] = features.get(index, 0.0) + 1.0 + math.log(tf)
+    norm = math.sqrt(sum(v * v for v in features.values())) or 1.0
+    return {i: v / norm for i, v in features.items()}
+
+
+def _sigmoid(z: float) -> float:
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+class LocalPageClassifier:
+    """Logistic regression over hashed n-grams; predicts P(syllabus) for a page."""
+
+    def __init__(self, weights: Dict[int, float], bias: float, version: int = 0,
+                 n_features: int = N_FEATURES, meta: Optional[dict] = None):
+        self.weights = weights
+        self.bias = bias
+        self.version = version
+        self.n_features = n_features
+        self.meta = meta or {}
+
+    def predict_proba(self, text: str) -> float:
+        z = self.bias
+        weights = self.weights
+        for index, value in hashed_features(text, self.n_features).items():
+            z += weights.get(index, 0.0) * value
+        return _sigmoid(z)
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        p = self.predict_proba(text)
+        return ("syllabus", p) if p >= 0.5 else ("question_paper", 1.0 - p)
+
+    @classmethod
+    def train(cls, samples: List[Tuple[str, str]], epochs: int = 15, learning_rate: float = 0.5,
+              l2: float = 1e-6, seed: int = 13) -> "LocalPageClassifier":
+        """Plain SGD on the logistic loss; fine for the few thousand pages we collect."""
+        data = [(hashed_features(text), 1.0 if normalize_label(label) == "syllabus" else 0.0) for text, label in samples]
+        weights: Dict[int, float] = {}
+        bias = 0.0
+        rng = random.Random(seed)
+
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            lr = learning_rate / (1 + epoch)
+            for features, y in data:
+                z = bias + sum(weights.get(i, 0.0) * v for i, v in features.items())
+                gradient = _sigmoid(z) - y
+                for i, v in features.items():
+                    w = weights.get(i, 0.0)
+                    weights[i] = w - lr * (gradient * v + l2 * w)
+                bias -= lr * gradient
+
+        weights = {i: w for i, w in weights.items() if abs(w) > 1e-6}
+        return cls(weights, bias)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "n_features": self.n_features,
+            "bias": self.bias,
+            "weights": {str(i): round(w, 6) for i, w in self.weights.items()},
+            "meta": self.meta,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LocalPageClassifier":
+        return cls(
+            weights={int(i): w for i, w in data["weights"].items()},
+            bias=data["bias"],
+            version=data.get("version", 0),
+            n_features=data.get("n_features", N_FEATURES),
+            meta=data.get("meta"),
+        )
+
+
+def _latest_path(model_dir: str) -> str:
+    return os.path.join(model_dir, "LATEST")
+
+
+def latest_version(model_dir: str = PAGE_CLASSIFIER_DIR) -> Optional[int]:
+    try:
+        with open(_latest_path(model_dir)) as f:
+            return int(f.read().strip())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def save_model(model: LocalPageClassifier, model_dir: str = PAGE_CLASSIFIER_DIR) -> str:
+    """Save the model as the next version and point LATEST at it."""
+    os.makedirs(model_dir, exist_ok=True)
+    model.version = (latest_version(model_dir) or 0) + 1
+    path = os.path.join(model_dir, f"v{model.version}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(model.to_dict(), f)
+
+    tmp_path = f"{_latest_path(model_dir)}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(model.version))
+    os.replace(tmp_path, _latest_path(model_dir))
+    return path
+
+
+def load_model(model_dir: str = PAGE_CLASSIFIER_DIR, version: Optional[int] = None) -> Optional[LocalPageClassifier]:
+    version = version or latest_version(model_dir)
+    if version is None:
+        return None
+    with open(os.path.join(model_dir, f"v{version}.json"), encoding="utf-8") as f:
+        return LocalPageClassifier.from_dict(json.load(f))
+
+
+def get_model() -> Optional[LocalPageClassifier]:
+    """Currently served model; picks up newly trained versions without a restart."""
+    global _model, _model_version, _model_checked_at
+    now = time.monotonic()
+    if now - _model_checked_at < RELOAD_CHECK_SECONDS:
+        return _model
+    with _model_lock:
+        if now - _model_checked_at >= RELOAD_CHECK_SECONDS:
+            version = latest_version()
+            if version != _model_version:
+                try:
+                    _model = load_model(version=version) if version else None
+                    _model_version = version
+                    print(f"📦 Loaded local page classifier v{version}")
+                except Exception as e:
+                    print(f"⚠️ Could not load local page classifier v{version}: {e}")
+            _model_checked_at = now
+    return _model
+
+
+def record_page_label(text: str, label: str):
+    """Append an LLM-labelled page to the training set when RECORD_PAGE_LABELS is on."""
+    if not RECORD_PAGE_LABELS or not text:
+        return
+    line = json.dumps({
+        "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        "label": normalize_label(label),
+        "text": text,
+        "recorded_at": datetime.utcnow().isoformat(),
+    }, ensure_ascii=False)
+    try:
+        with _record_lock:
+            os.makedirs(os.path.dirname(PAGE_LABELS_PATH) or ".", exist_ok=True)
+            with open(PAGE_LABELS_PATH, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        print(f"⚠️ Could not record page label: {e}")
+
+
+def load_labelled_pages(path: str = PAGE_LABELS_PATH) -> List[Tuple[str, str]]:
+    """Recorded (text, label) pairs, deduplicated by page text (last label wins)."""
+    pages: Dict[str, Tuple[str, str]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            pages[row["sha256"]] = (row["text"], row["label"])
+    return list(pages.values())
+
+
+def _count(source: str):
+    # Called from many classifier threads at once
+    with _counters_lock:
+        _counters[source] += 1
+
+
+def classify_page(text: str, threshold: Optional[float] = None) -> str:
+    """Classify a page locally when the model is confident enough, otherwise ask the LLM."""
+    threshold = LOCAL_CLASSIFIER_THRESHOLD if threshold is None else threshold
+    model = get_model()
+    if model is not None:
+        label, confidence = model.predict(text)
+        if confidence >= threshold:
+            _count("local")
+            return label
+
+    _count("llm")
+    answer = classify_chunk_with_llm(text).strip().strip("\"'`.")
+    # Only exact answers are recorded; anything else would be stored as a guessed label
+    if answer in PAGE_LABELS:
+        record_page_label(text, answer)
+    return normalize_label(answer)
+
+
+def classifier_stats() -> dict:
+    with _counters_lock:
+        counters = dict(_counters)
+    return {**counters, "model_version": _model_version, "threshold": LOCAL_CLASSIFIER_THRESHOLD,
+            "recording": RECORD_PAGE_LABELS}
+
+
+def evaluate(model: LocalPageClassifier, samples: Iterable[Tuple[str, str]], threshold: float) -> dict:
+    total = correct = covered = covered_correct = 0
+    for text, label in samples:
+        predicted, confidence = model.predict(text)
+        total += 1
+        correct += predicted == normalize_label(label)
+        if confidence >= threshold:
+            covered += 1
+            covered_correct += predicted == normalize_label(label)
+    return {
+        "samples": total,
+        "accuracy": round(correct / total, 4) if total else None,
+        "coverage": round(covered / total, 4) if total else None,
+        "accuracy_when_confident": round(covered_correct / covered, 4) if covered else None,
+    }
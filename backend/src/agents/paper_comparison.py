@@ -0,0 +1,220 @@
+import contextvars
+import json
+import math
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src.agents.fast_predictor import paper_statistics
+from src.agents.llm import complete
+from src.agents.ques_paper_analyzer import analyze_question_paper
+
+YEAR = re.compile(r"\b(20\d{2})\b")
+DIGEST_WORKERS = 4
+
+
+def _normalize_topic(topic: Any) -> Optional[str]:
+    if isinstance(topic, dict):
+        topic = topic.get("topic") or topic.get("name") or topic.get("title")
+    if not isinstance(topic, str):
+        return None
+    topic = " ".join(topic.lower().split()).strip(" .:-")
+    return topic or None
+
+
+def _numeric(mapping: Any) -> Dict[str, float]:
+    """Keep the numeric entries of an LLM-produced {name: count/marks} object."""
+    if not isinstance(mapping, dict):
+        return {}
+    values = {}
+    for key, value in mapping.items():
+        if isinstance(value, dict):
+            value = value.get("marks", value.get("count", value.get("total")))
+        if isinstance(value, str):
+            match = re.search(r"\d+(?:\.\d+)?", value)
+            value = float(match.group()) if match else None
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[" ".join(str(key).lower().split())] = value
+    return values
+
+
+def _int_or_none(value: Any) -> Optional[int]:
+    """LLM numbers arrive as 60, 60.0 or "60 marks"; anything else is unknown."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) if math.isfinite(value) else None
+    if isinstance(value, str):
+        match = re.search(r"\d+", value)
+        return int(match.group()) if match else None
+    return None
+
+
+def is_valid_digest(digest: Any) -> bool:
+    """Shape check for digests read from or written to the cache."""
+    return (
+        isinstance(digest, dict)
+        and isinstance(digest.get("topics"), list) and all(isinstance(t, str) for t in digest["topics"])
+        and all(digest.get(k) is None or type(digest[k]) is int for k in ("year", "max_marks", "total_questions"))
+        and all(isinstance(digest.get(k), dict) for k in ("marks_distribution", "question_types", "marks_per_question"))
+    )
+
+
+def digest_paper(paper_text: str) -> Dict[str, Any]:
+    """
+    Compact structured summary of one paper: topics, marks distribution and
+    question types. Uses one LLM analysis call, with local statistics filling
+    in (and standing in when the analysis fails or is malformed). Only a
+    digest whose topics came from the LLM is marked source "llm".
+    """
+    analysis = analyze_question_paper(paper_text)
+    local = paper_statistics([paper_text])
+    ok = isinstance(analysis, dict) and "error" not in analysis
+    if not ok:
+        analysis = {}
+
+    # A string or null "topics_covered" is not a topic list; use local terms instead
+    llm_topics = analysis.get("topics_covered")
+    topics = sorted({t for t in map(_normalize_topic, llm_topics) if t}) if isinstance(llm_topics, list) else []
+    ok = ok and bool(topics)
+    topics = topics or sorted(local["frequent_terms"])
+
+    session = analysis.get("academic_session")
+    session = str(session) if isinstance(session, (str, int)) else ""
+    year = YEAR.search(session) or YEAR.search(paper_text[:300])
+
+    return {
+        "session": session or None,
+        "year": int(year.group(1)) if year else None,
+        "max_marks": _int_or_none(analysis.get("max_marks")) or local["max_marks"],
+        "total_questions": _int_or_none(analysis.get("total_questions")) or sum(local["question_types"].values()),
+        "topics": topics,
+        "marks_distribution": _numeric(analysis.get("marks_distribution"))
+                              or {s["section"].lower(): s["avg_marks"] for s in local["sections"]},
+        "question_types": _numeric(analysis.get("question_types")) or local["question_types"],
+        "marks_per_question": local["marks_per_question"],
+        "source": "llm" if ok else "local",
+    }
+
+
+def _shift(previous: Dict[str, float], current: Dict[str, float]) -> Dict[str, float]:
+    keys = sorted(previous.keys() | current.keys())
+    return {k: round(current.get(k, 0) - previous.get(k, 0), 2) for k in keys if current.get(k, 0) != previous.get(k, 0)}
+
+
+def diff_digests(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Deterministic year-over-year difference between two paper digests."""
+    before, after = set(previous["topics"]), set(current["topics"])
+    return {
+        "new_topics": sorted(after - before),
+        "dropped_topics": sorted(before - after),
+        "retained_topics": sorted(after & before),
+        "marks_shift": _shift(previous["marks_distribution"], current["marks_distribution"]),
+        "question_type_shift": _shift(previous["question_types"], current["question_types"]),
+        "max_marks_change": (current["max_marks"] or 0) - (previous["max_marks"] or 0)
+                            if current["max_marks"] and previous["max_marks"] else None,
+    }
+
+
+class ComparisonEngine:
+    """
+    Incremental comparison over paper digests. Each `add` costs one diff
+    against the previous paper, so a new year never re-processes older papers.
+    """
+
+    def __init__(self):
+        self.labels: List[str] = []
+        self.digests: List[Dict[str, Any]] = []
+        self.timeline: List[Dict[str, Any]] = []
+        self.topic_counts: Counter = Counter()
+        self.topic_first_seen: Dict[str, int] = {}
+
+    def add(self, digest: Dict[str, Any], label: Optional[str] = None) -> Dict[str, Any]:
+        index = len(self.digests)
+        label = label or (str(digest["year"]) if digest.get("year") else f"paper {index + 1}")
+        entry: Dict[str, Any] = {"paper": label}
+        if self.digests:
+            entry.update(diff_digests(self.digests[-1], digest))
+            # Topics never seen in any earlier paper, not just the previous one
+            entry["first_time_topics"] = [t for t in entry["new_topics"] if t not in self.topic_first_seen]
+        else:
+            entry["topics"] = digest["topics"]
+
+        for topic in digest["topics"]:
+            self.topic_counts[topic] += 1
+            self.topic_first_seen.setdefault(topic, index)
+        self.labels.append(label)
+        self.digests.append(digest)
+        self.timeline.append(entry)
+        return entry
+
+    def _series(self, field: str) -> Dict[str, List[Optional[float]]]:
+        keys = sorted({k for d in self.digests for k in d[field]})
+        return {k: [d[field].get(k) for d in self.digests] for k in keys}
+
+    def trends(self) -> Dict[str, Any]:
+        n = len(self.digests)
+        if not n:
+            return {"paper_count": 0}
+        latest = set(self.digests[-1]["topics"])
+        # A topic is discontinued once it is missing from the last two papers
+        window = self.digests[-2:] if n > 2 else self.digests[-1:]
+        recent = set().union(*(d["topics"] for d in window))
+        recurring = [t for t, c in self.topic_counts.most_common() if c >= math.ceil(n / 2)]
+        return {
+            "paper_count": n,
+            "papers": self.labels,
+            "topic_frequency": dict(self.topic_counts.most_common()),
+            "always_asked": [t for t, c in self.topic_counts.items() if c == n],
+            "recurring_topics": recurring,
+            "discontinued_topics": sorted(t for t in self.topic_counts if t not in recent),
+            "new_in_latest": sorted(t for t in latest if self.topic_first_seen[t] == n - 1) if n > 1 else [],
+            "marks_distribution_series": self._series("marks_distribution"),
+            "question_type_series": self._series("question_types"),
+            "max_marks_series": [d["max_marks"] for d in self.digests],
+            "total_questions_series": [d["total_questions"] for d in self.digests],
+        }
+
+
+def narrate_trends(trends: Dict[str, Any], max_topics: int = 15) -> str:
+    """Short plain-text summary of already computed trends; one small LLM call."""
+    compact = {
+        **{k: v for k, v in trends.items() if k != "topic_frequency"},
+        "topic_frequency": dict(list(trends.get("topic_frequency", {}).items())[:max_topics]),
+        "recurring_topics": trends.get("recurring_topics", [])[:max_topics],
+    }
+    prompt = f"""
+    You are an academic exam analyst. The following year-over-year trends were computed from past question papers.
+    Write a short summary (3-5 sentences) for a student: what keeps coming back, what changed recently and what to focus on.
+    Do not invent topics that are not listed. Return plain text only.
+
+    Trends:
+    {json.dumps(compact)}
+    """
+    try:
+        return complete(prompt, temperature=0.3).strip()
+    except Exception as e:
+        print(f"⚠️ Trend summary failed: {e}")
+        return ""
+
+
+def compare_papers(papers: List[str], digest_fn: Callable[[str], Dict[str, Any]] = digest_paper,
+                   labels: Optional[List[str]] = None, narrate: bool = True) -> Dict[str, Any]:
+    """Digest papers in parallel, fold them through a ComparisonEngine in order and summarise."""
+    # One copy of the caller's context per paper (e.g. the LLM call counter); a
+    # context copied inside the worker thread would not carry it
+    contexts = [contextvars.copy_context() for _ in papers]
+    with ThreadPoolExecutor(max_workers=DIGEST_WORKERS) as executor:
+        digests = list(executor.map(lambda ctx, paper: ctx.run(digest_fn, paper), contexts, papers))
+
+    engine = ComparisonEngine()
+    for i, digest in enumerate(digests):
+        engine.add(digest, labels[i] if labels else None)
+    trends = engine.trends()
+    return {
+        "timeline": engine.timeline,
+        "trends": trends,
+        "summary": narrate_trends(trends) if narrate else "",
+        "paper_count": len(papers),
+    }
@@ -0,0 +1,214 @@
+import contextvars
+import queue
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LTTextContainer
+
+from src.agents.local_classifier import classify_page
+
+PAGE_QUEUE_SIZE = 8
+CLASSIFIER_WORKERS = 4
+ANALYSIS_WORKERS = 4
+
+# A question page whose header carries a session/year starts a new paper
+PAPER_HEADER = re.compile(r"20\d{2}-\d{2}|20\d{2}|May \d{4}")
+PAPER_HEADER_CHARS = 300
+
+_DONE = object()
+
+
+class _Stopped(Exception):
+    pass
+
+
+def _put(q: queue.Queue, item: Any, stop: threading.Event):
+    # Blocking put that gives up once the pipeline is being torn down
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+    raise _Stopped()
+
+
+def _get(q: queue.Queue, stop: threading.Event) -> Any:
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    raise _Stopped()
+
+
+def _extract(pdf, pages: queue.Queue, stop: threading.Event, errors: queue.Queue):
+    try:
+        for i, page_layout in enumerate(extract_pages(pdf)):
+            text = ""
+            for element in page_layout:
+                if isinstance(element, LTTextContainer):
+                    text += element.get_text()
+            _put(pages, (i, text.strip()), stop)
+    except _Stopped:
+        return
+    except Exception as e:
+        errors.put(e)
+    finally:
+        for _ in range(CLASSIFIER_WORKERS):
+            try:
+                _put(pages, _DONE, stop)
+            except _Stopped:
+                return
+
+
+def _classify(classify: Callable[[str], str], pages: queue.Queue, results: queue.Queue, stop: threading.Event):
+    try:
+        while True:
+            item = _get(pages, stop)
+            if item is _DONE:
+                break
+            i, text = item
+            try:
+                tag = classify(text)
+            except Exception as e:
+                _put(results, (i, text, e), stop)
+                continue
+            print(f"🧠 Page {i+1}: {tag}")
+            _put(results, (i, text, tag), stop)
+    except _Stopped:
+        return
+    finally:
+        try:
+            _put(results, _DONE, stop)
+        except _Stopped:
+            pass
+
+
+def _result(future: Future, default: Any) -> Any:
+    # Analysis is best-effort; a failed analysis must not fail the whole upload
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"⚠️ Analysis failed: {e}")
+        return default
+
+
+def run_pipeline(
+    pdf,
+    classify: Callable[[str], str] = classify_page,
+    analyze_paper: Optional[Callable[[str], Any]] = None,
+    analyze_syllabus: Optional[Callable[[str], Any]] = None,
+    split_papers: bool = True,
+) -> Dict[str, Any]:
+    """
+    Extract, classify and analyze a PDF as a streaming pipeline.
+
+    Pages flow through bounded queues from a single extractor thread to a pool
+    of classifier threads. Classified pages are put back in page order and
+    segmented on the fly: each paper is handed to `analyze_paper` as soon as
+    its last page is known, and `analyze_syllabus` starts as soon as a block
+    of syllabus pages ends. A new paper starts only at a PAPER_HEADER page; a
+    stray syllabus page does not split the paper around it. With
+    `split_papers=False` all question pages form one paper (e.g. one PDF per
+    paper). No analysis is left running once this returns.
+    """
+    stop = threading.Event()
+    errors: queue.Queue = queue.Queue()
+    pages: queue.Queue = queue.Queue(maxsize=PAGE_QUEUE_SIZE)
+    results: queue.Queue = queue.Queue(maxsize=PAGE_QUEUE_SIZE)
+
+    # Worker threads run in copies of the caller's context (e.g. the LLM call counter)
+    threads = [threading.Thread(target=contextvars.copy_context().run, args=(_extract, pdf, pages, stop, errors), daemon=True)]
+    threads += [
+        threading.Thread(target=contextvars.copy_context().run, args=(_classify, classify, pages, results, stop), daemon=True)
+        for _ in range(CLASSIFIER_WORKERS)
+    ]
+
+    papers: List[str] = []
+    paper_futures: List[Future] = []
+    syllabus_pages: List[str] = []
+    syllabus_future: Optional[Future] = None
+    syllabus_submitted_pages = 0
+    current_paper: List[str] = []
+    in_syllabus_block = False
+
+    executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+
+    def close_paper():
+        if not current_paper:
+            return
+        paper = "\n\n".join(current_paper)
+        current_paper.clear()
+        papers.append(paper)
+        if analyze_paper:
+            paper_futures.append(executor.submit(contextvars.copy_context().run, analyze_paper, paper))
+
+    def close_syllabus_block():
+        nonlocal syllabus_future, syllabus_submitted_pages, in_syllabus_block
+        in_syllabus_block = False
+        if analyze_syllabus and len(syllabus_pages) > syllabus_submitted_pages:
+            # A later syllabus block supersedes the earlier extraction
+            if syllabus_future:
+                syllabus_future.cancel()
+            syllabus_submitted_pages = len(syllabus_pages)
+            syllabus_future = executor.submit(contextvars.copy_context().run, analyze_syllabus, "\n\n".join(syllabus_pages))
+
+    def handle(text: str, tag: str):
+        nonlocal in_syllabus_block
+        if tag == "syllabus":
+            syllabus_pages.append(text)
+            in_syllabus_block = True
+            return
+        if in_syllabus_block:
+            close_syllabus_block()
+        if split_papers and current_paper and PAPER_HEADER.search(text[:PAPER_HEADER_CHARS]):
+            close_paper()
+        current_paper.append(text)
+
+    try:
+        for thread in threads:
+            thread.start()
+
+        # Classifiers finish out of order; a small reorder buffer restores page order
+        pending: Dict[int, tuple] = {}
+        next_page = 0
+        finished_workers = 0
+        while finished_workers < CLASSIFIER_WORKERS:
+            item = results.get()
+            if item is _DONE:
+                finished_workers += 1
+                continue
+            i, text, tag = item
+            if isinstance(tag, Exception):
+                raise tag
+            pending[i] = (text, tag)
+            while next_page in pending:
+                handle(*pending.pop(next_page))
+                next_page += 1
+
+        if not errors.empty():
+            raise errors.get()
+
+        close_paper()
+        if in_syllabus_block:
+            close_syllabus_block()
+
+        return {
+            "papers": papers,
+            "paper_analyses": [_result(f, {"error": "Analysis failed"}) for f in paper_futures],
+            "question_papers": "\n\n".join(papers),
+            "syllabus": "\n\n".join(syllabus_pages),
+            "syllabus_analysis": _result(syllabus_future, None) if syllabus_future else None,
+            # Tells a failed analysis (None above) apart from one that never ran
+            "syllabus_analyzed": syllabus_future is not None,
+        }
+    finally:
+        stop.set()
+        # Queued analyses are dropped; running ones (e.g. a superseded syllabus
+        # extraction, which cancel() cannot stop) are waited for so no work
+        # outlives the call
+        executor.shutdown(wait=True, cancel_futures=True)
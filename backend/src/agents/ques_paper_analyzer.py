@@ -1,6 +1,6 @@
-from litellm import completion
 import os
 from dotenv import load_dotenv
+from src.agents.llm import complete
 import re
 import json
 from typing import Dict, List, Any, Optional
@@ -48,21 +48,10 @@ def analyze_question_paper(question_paper_text: str) -> Dict[str, Any]:
     """
 
     try:
-        response = completion(
-            model="groq/gemma2-9b-it",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            stream=False,
-        )
-
-        # Safe chain to avoid attribute errors
-        extracted = getattr(response.choices[0].message, "content", "")     #type: ignore
-        if extracted is None:
+        extracted = complete(prompt, temperature=0.2).strip()
+        if not extracted:
             return {"error": "No response from LLM"}
-        extracted = extracted.strip()
-        extracted = _clean_llm_json(extracted)
-
-        return json.loads(extracted)
+        return _clean_llm_json(extracted)
     except json.JSONDecodeError as e:
         return {
             "error": "Failed to parse JSON",
@@ -98,20 +87,10 @@ def extract_question_patterns(question_paper_text: str) -> Dict[str, Any]:
     """
 
     try:
-        response = completion(
-            model="groq/gemma2-9b-it",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-            stream=False,
-        )
-
-        extracted = getattr(response.choices[0].message, "content", "")     #type: ignore
-        if extracted is None:
+        extracted = complete(prompt, temperature=0.1).strip()
+        if not extracted:
             return {"error": "No response from LLM"}
-        extracted = extracted.strip()
-        extracted = _clean_llm_json(extracted)
-
-        return json.loads(extracted)
+        return _clean_llm_json(extracted)
     except json.JSONDecodeError as e:
         return {"patterns": "Could not extract patterns", "raw_output": extracted, "exception": str(e)}     #type: ignore
     except Exception as e:
@@ -123,47 +102,17 @@ def compare_question_papers(papers: List[str]) -> Dict[str, Any]:
     if len(papers) < 2:
         return {"error": "At least 2 question papers required for comparison"}
 
-    combined_text = "\n\n--- PAPER SEPARATOR ---\n\n".join(papers)
-    
-    prompt = f"""
-    Compare these multiple question papers and identify:
-
-    1. Common topics that appear across papers
-    2. Question format trends over time
-    3. Marks distribution patterns
-    4. Difficulty progression
-    5. Topics that are frequently repeated
-    6. New topics that have been introduced
-    7. Topics that have been discontinued
-
-    Papers to compare:
-    {combined_text}
-
-    Provide analysis in JSON format with insights about trends and patterns.
-    """
-
+    # Trends are computed locally from cached per-paper digests; the LLM only writes
+    # the summary. Imported here because both modules import this one.
+    from src.agents.paper_comparison import compare_papers
+    from src.core.digest_store import get_or_create_digest
     try:
-        response = completion(
-            model="groq/gemma2-9b-it",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
-            stream=False,
-        )
-
-        extracted = getattr(response.choices[0].message, "content", "")     #type: ignore
-        if extracted is None:
-            return {"error": "No response from LLM"}
-        extracted = extracted.strip()
-        extracted = _clean_llm_json(extracted)
-
-        return json.loads(extracted)
-    except json.JSONDecodeError as e:
-        return {"comparison": "Could not analyze papers", "raw_output": extracted, "exception": str(e)}     #type: ignore
+        return compare_papers(papers, digest_fn=get_or_create_digest)
     except Exception as e:
         return {"error": f"Comparison failed: {str(e)}", "paper_count": len(papers)}
 
 
-def predict_next_paper_structure(question_papers: List[str], syllabus_text: Optional[str] = None) -> dict:
+def predict_next_paper_structure(question_papers: List[str], syllabus_text: Optional[str] = None, syllabus_stats: Optional[dict] = None, paper_analyses: Optional[List[dict]] = None) -> dict:
     if not question_papers:
         return {"error": "No question papers provided for prediction"}
     
@@ -171,6 +120,12 @@ def predict_next_paper_structure(question_papers: List[str], syllabus_text: Opti
     context = f"Historical Question Papers:\n{papers_text}"
     if syllabus_text:
         context += f"\n\nCurrent Syllabus:\n{syllabus_text}"
+    if syllabus_stats:
+        # Unit coverage/weightage computed locally from the syllabus index
+        context += f"\n\nSyllabus Unit Coverage In Past Papers:\n{json.dumps(syllabus_stats)}"
+    analyses = [a for a in (paper_analyses or []) if isinstance(a, dict) and "error" not in a]
+    if analyses:
+        context += f"\n\nPer-Paper Analysis:\n{json.dumps(analyses)}"
 
     prompt = f"""
     Based on the historical question papers provided{' and current syllabus' if syllabus_text else ''}, predict the structure and likely content of the next question paper.
@@ -190,14 +145,7 @@ def predict_next_paper_structure(question_papers: List[str], syllabus_text: Opti
     """
 
     try:
-        response = completion(
-            model="groq/gemma2-9b-it",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-            stream=False,
-        )
-
-        raw_output = getattr(response.choices[0].message, "content", "").strip()  # type: ignore
+        raw_output = complete(prompt, temperature=0.2).strip()
         if not raw_output:
             return {"error": "No response from LLM"}
 
@@ -213,12 +161,15 @@ def predict_next_paper_structure(question_papers: List[str], syllabus_text: Opti
             }
 
         # Format the response
-        return format_prediction_response(
+        result = format_prediction_response(
             prediction=cleaned_output,
             raw_output=raw_output,
             input_papers=len(question_papers),
             has_syllabus=syllabus_text is not None
         )
+        if syllabus_stats:
+            result["syllabus_unit_coverage"] = syllabus_stats
+        return result
     except Exception as e:
         return {
             "error": f"Prediction failed: {str(e)}",
@@ -0,0 +1,30 @@
+import re
+from typing import List, Optional
+
+# A new question starts on a line like "Q1.", "Q.2", "3.", "4)" or "Question 5"
+QUESTION_START = re.compile(r"^\s*(?:Q(?:uestion)?\s*\.?\s*\d+|\d{1,2}\s*[.)])\s*", re.IGNORECASE | re.MULTILINE)
+
+# "[5 marks]", "(10)", "5 Marks", "[CO2] (7)" ...
+MARKS = re.compile(r"\[\s*(\d{1,2})\s*marks?\s*\]|\(\s*(\d{1,2})\s*(?:marks?)?\s*\)|\b(\d{1,2})\s*marks?\b", re.IGNORECASE)
+
+
+def split_questions(paper_text: str) -> List[str]:
+    """Split the text of one question paper into individual questions."""
+    starts = [m.start() for m in QUESTION_START.finditer(paper_text)]
+    if not starts:
+        return []
+    starts.append(len(paper_text))
+    questions = []
+    for begin, end in zip(starts, starts[1:]):
+        question = paper_text[begin:end].strip()
+        if question:
+            questions.append(question)
+    return questions
+
+
+def question_marks(question_text: str) -> Optional[int]:
+    """Return the marks printed against a question, if any."""
+    for match in MARKS.finditer(question_text):
+        value = next(group for group in match.groups() if group)
+        return int(value)
+    return None
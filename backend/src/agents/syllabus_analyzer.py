@@ -1,6 +1,6 @@
-from litellm import completion
 import os
 from dotenv import load_dotenv
+from src.agents.llm import complete
 import re
 import json
 
@@ -18,14 +18,7 @@ def extract_syllabus_with_llm(syllabus_text: str) -> dict:
     {syllabus_text}
     """
 
-    response = completion(
-        model="groq/gemma2-9b-it",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.2,
-        stream=False,
-    )
-
-    extracted = response.choices[0].message["content"].strip()          #type: ignore
+    extracted = complete(prompt, temperature=0.2).strip()
 
     # Remove markdown-style triple backticks if present
     if extracted.startswith("```json"):
@@ -0,0 +1,190 @@
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.agents.question_parser import split_questions, question_marks
+
+STOPWORDS = {
+    "the", "and", "for", "with", "from", "into", "its", "are", "was", "were", "this", "that", "these",
+    "what", "which", "how", "why", "when", "where", "any", "all", "each", "their", "your", "you",
+    "explain", "describe", "define", "discuss", "write", "short", "note", "notes", "give", "state",
+    "briefly", "detail", "following", "example", "examples", "between", "marks", "mark", "answer",
+    "question", "questions", "attempt", "unit", "using", "about", "also", "can", "not", "has", "have",
+}
+
+TOKEN = re.compile(r"[a-z][a-z0-9+#]+")
+UNIT_KEYS = ("units", "unit", "modules", "module", "chapters", "chapter", "content", "course_content", "syllabus")
+TITLE_KEYS = ("unit", "unit_title", "title", "name", "module", "chapter", "heading")
+
+MAX_CACHED_INDEXES = 256
+_index_cache: "OrderedDict[str, SyllabusIndex]" = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def normalize_syllabus_text(text: str) -> str:
+    # Case, punctuation and whitespace differ between scans of the same syllabus
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def syllabus_fingerprint(text: str) -> str:
+    return hashlib.sha256(normalize_syllabus_text(text).encode("utf-8")).hexdigest()
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        # Cheap plural folding so "algorithms" matches "algorithm"
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _strings(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [s for v in value.values() for s in _strings(v)]
+    if isinstance(value, list):
+        return [s for v in value for s in _strings(v)]
+    return []
+
+
+def _unit_list(structure: Dict[str, Any]) -> List[Any]:
+    for key in UNIT_KEYS:
+        value = structure.get(key)
+        if isinstance(value, list) and value:
+            return value
+        if isinstance(value, dict) and value:
+            # {"Unit I": [...], "Unit II": [...]}
+            return [{"title": k, "topics": v} for k, v in value.items()]
+    # Fall back to the first non-empty list anywhere at the top level
+    for value in structure.values():
+        if isinstance(value, list) and value:
+            return value
+    return []
+
+
+def extract_units(structure: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten the free-form LLM syllabus JSON into [{"name", "topics"}]."""
+    units = []
+    for i, item in enumerate(_unit_list(structure or {})):
+        if isinstance(item, dict):
+            titles = [str(item[k]) for k in TITLE_KEYS if isinstance(item.get(k), (str, int))]
+            name = " - ".join(dict.fromkeys(titles)) or f"Unit {i + 1}"
+            topics = [s for k, v in item.items() if k not in TITLE_KEYS for s in _strings(v)]
+        else:
+            name = str(item) if isinstance(item, str) else f"Unit {i + 1}"
+            topics = _strings(item) if not isinstance(item, str) else []
+        units.append({"name": name, "topics": topics})
+    return units
+
+
+class SyllabusIndex:
+    """BM25 inverted index over syllabus units, used to map questions to units locally."""
+
+    def __init__(self, units: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.units = units
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths: List[int] = []
+
+        for doc_id, unit in enumerate(units):
+            tokens = tokenize(" ".join([unit["name"], *unit["topics"]]))
+            self.doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings[term].append((doc_id, tf))
+
+        n_docs = len(units)
+        self.avg_length = (sum(self.doc_lengths) / n_docs) if n_docs else 0.0
+        self.idf = {
+            term: math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    @classmethod
+    def from_structure(cls, structure: Dict[str, Any]) -> "SyllabusIndex":
+        return cls(extract_units(structure))
+
+    def score(self, text: str) -> Dict[int, float]:
+        scores: Dict[int, float] = defaultdict(float)
+        for term, qtf in Counter(tokenize(text)).items():
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / (self.avg_length or 1)
+                scores[doc_id] += qtf * idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        return scores
+
+    def map_question(self, text: str, min_score: float = 0.0) -> Optional[int]:
+        """Return the index of the best-matching unit, or None if nothing matches well."""
+        scores = self.score(text)
+        if not scores:
+            return None
+        doc_id, best = max(scores.items(), key=lambda item: item[1])
+        return doc_id if best > min_score else None
+
+    def coverage_stats(self, papers: List[str]) -> Dict[str, Any]:
+        """Unit coverage and marks weightage of the given papers, computed without the LLM."""
+        per_unit = [
+            {"unit": unit["name"], "questions": 0, "marks": 0, "papers": set()}
+            for unit in self.units
+        ]
+        unmapped = 0
+        total_questions = 0
+        total_marks = 0
+
+        for paper_no, paper in enumerate(papers):
+            for question in split_questions(paper):
+                total_questions += 1
+                marks = question_marks(question) or 0
+                total_marks += marks
+                doc_id = self.map_question(question)
+                if doc_id is None:
+                    unmapped += 1
+                    continue
+                per_unit[doc_id]["questions"] += 1
+                per_unit[doc_id]["marks"] += marks
+                per_unit[doc_id]["papers"].add(paper_no)
+
+        units = []
+        for stats in per_unit:
+            units.append({
+                "unit": stats["unit"],
+                "questions": stats["questions"],
+                "marks": stats["marks"],
+                "marks_share": round(stats["marks"] / total_marks, 3) if total_marks else 0.0,
+                "papers_appeared_in": len(stats["papers"]),
+            })
+
+        return {
+            "total_papers": len(papers),
+            "total_questions": total_questions,
+            "unmapped_questions": unmapped,
+            "units": units,
+            "never_asked_units": [u["unit"] for u in units if u["questions"] == 0],
+        }
+
+
+def get_syllabus_index(fingerprint: str, structure: Dict[str, Any]) -> SyllabusIndex:
+    """Return a cached index for this syllabus, building it on first use."""
+    with _index_lock:
+        index = _index_cache.get(fingerprint)
+        if index is not None:
+            _index_cache.move_to_end(fingerprint)
+            return index
+    # Built outside the lock; a concurrent build of the same syllabus just wins or loses the insert
+    index = SyllabusIndex.from_structure(structure)
+    with _index_lock:
+        index = _index_cache.setdefault(fingerprint, index)
+        _index_cache.move_to_end(fingerprint)
+        if len(_index_cache) > MAX_CACHED_INDEXES:
+            _index_cache.popitem(last=False)
+    return index
@@ -1,85 +1,341 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from fastapi.responses import PlainTextResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Header, Query
+from fastapi.responses import PlainTextResponse, Response
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+import asyncio
+import contextvars
+import hashlib
+import io
 
 
-from src.agents.classifier import split_pdf_by_classification
-from src.agents.syllabus_analyzer import extract_syllabus_with_llm
+from src.agents.fast_predictor import classify_sampled_pages, segment_papers, predict_structure_locally
+from src.agents.llm import llm_flight, llm_stats, count_llm_calls
+from src.agents.local_classifier import classifier_stats
+from src.agents.pipeline import run_pipeline
+from src.agents.syllabus_index import get_syllabus_index, syllabus_fingerprint
+from src.agents.paper_comparison import ComparisonEngine, is_valid_digest, narrate_trends
 from src.agents.ques_paper_analyzer import predict_next_paper_structure
 
 # import time
 # import 
-from src.core.dependencies import get_current_user
+from config import AI_WORKER_THREADS, AI_FILE_PIPELINE_THREADS
+from src.core.admission import HEAVY
+from src.core.dependencies import get_current_user, ai_slot, admission
+from src.core.digest_store import get_or_create_digest, find_upload_digests
+from src.core.syllabus_store import get_or_extract_syllabus, find_syllabus
+from src.core.prediction_store import save_prediction, list_predictions, get_prediction, read_prediction_body, representation_etag, etag_matches
+from src.db.db import get_db, SessionLocal
 from src.models.user import User
+from src.schemas.prediction_schema import PredictionSummary
+from src.utils.encoding import choose_encoding
+from src.utils.singleflight import AsyncSingleFlight
 import os
 
 router = APIRouter(prefix='/ai', tags=['exam-paper'])
 
 UPLOAD_DIR = "uploads"
-OUTPUTS_DIR = "outputs"
+MAX_BATCH_FILES = 20
 os.makedirs(UPLOAD_DIR, exist_ok=True)
-os.makedirs(OUTPUTS_DIR, exist_ok=True)
 
+# Runs are thread-backed, so an abandoned run keeps going and stays joinable
+upload_flight = AsyncSingleFlight()
 
-@router.post("/predict-question-paper", response_class=PlainTextResponse)
-async def predict_question_paper(current_user : User = Depends(get_current_user), file: UploadFile = File(...)):
+# Long AI work runs on its own bounded pools instead of the default executor,
+# which stays free for short calls (saving and fetching predictions). Per-file
+# pipelines of multi-file uploads get a separate pool so one big batch cannot
+# hold up single uploads.
+ai_executor = ThreadPoolExecutor(max_workers=AI_WORKER_THREADS, thread_name_prefix="ai")
+file_pipeline_executor = ThreadPoolExecutor(max_workers=AI_FILE_PIPELINE_THREADS, thread_name_prefix="ai-file")
+
+
+def _run_in(executor: Executor, fn: Callable[..., Any], *args, **kwargs) -> "asyncio.Future[Any]":
+    # Like asyncio.to_thread (including the context copy, e.g. the LLM call counter) on a given executor
+    ctx = contextvars.copy_context()
+    return asyncio.get_running_loop().run_in_executor(executor, partial(ctx.run, fn, *args, **kwargs))
+
+PredictionMode = Literal["fast", "balanced", "thorough"]
+
+
+def _predict_from_papers(papers: List[str], syllabus_text: str,
+                         syllabus: Optional[Tuple] = None, paper_analyses: Optional[List[dict]] = None) -> dict:
+    # Structured syllabus is shared across users, keyed by its text fingerprint
+    syllabus_stats = None
+    try:
+        fingerprint, syllabus_struct = syllabus if syllabus is not None else get_or_extract_syllabus(syllabus_text)
+        if syllabus_struct:
+            # Map questions to syllabus units locally (BM25), no LLM call
+            syllabus_stats = get_syllabus_index(fingerprint, syllabus_struct).coverage_stats(papers)      #type: ignore
+    except Exception as e:
+        syllabus_struct = None  # fallback if extraction fails
+
+    # Predict next year's question paper (LLM-based synthesis)
+    try:
+        return predict_next_paper_structure(
+            papers,
+            syllabus_text=syllabus_text,
+            syllabus_stats=syllabus_stats,
+            paper_analyses=paper_analyses
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+
+def _store_prediction(db: Session, user_id: int, prediction: dict, source_hash: str, response: Response):
+    # Saving is best-effort: the caller still gets the prediction if it fails.
+    # Failed predictions are not stored, so they never get an id or ETag.
+    if not isinstance(prediction, dict) or "error" in prediction:
+        return
+    try:
+        record = save_prediction(db, user_id, prediction, source_hash=source_hash)
+        response.headers["X-Prediction-Id"] = str(record.id)
+        response.headers["ETag"] = record.etag
+    except Exception as e:
+        db.rollback()
+        print(f"Error saving prediction: {e}")
+
+
+def _predict_fast(db: Session, content: bytes) -> dict:
+    # Sampled pages, local statistics, at most one (batched classification) LLM call
+    classified = classify_sampled_pages(io.BytesIO(content))
+    papers = segment_papers(classified["question_pages"])
+    if not papers:
+        raise HTTPException(status_code=400, detail="No question paper pages found in the sampled pages.")
+
+    # Syllabus pages cover every page of each sampled syllabus block, so a syllabus
+    # stored by an earlier balanced/thorough run of the same PDF is found here
+    syllabus_text = "\n\n".join(classified["syllabus_pages"])
+    fingerprint, syllabus_struct = find_syllabus(db, syllabus_text)
+    syllabus_stats = get_syllabus_index(fingerprint, syllabus_struct).coverage_stats(papers) if syllabus_struct else None      #type: ignore
+
+    prediction = predict_structure_locally(papers, syllabus_stats, has_syllabus=bool(syllabus_text))
+    prediction["sampled_pages"] = classified["sampled_pages"]
+    prediction["total_pages"] = classified["total_pages"]
+    prediction["extracted_pages"] = classified["extracted_pages"]
+    return prediction
+
+
+def _predict_upload(content: bytes, mode: PredictionMode) -> dict:
+    # Runs detached from the request that started it, so it uses its own session
+    db = SessionLocal()
+    try:
+        with count_llm_calls() as llm_calls:
+            if mode == "fast":
+                prediction = _predict_fast(db, content)
+            else:
+                # Stream pages through classification; in thorough mode each past paper
+                # is digested (or its cached digest reused) as soon as its pages are
+                # complete, and the syllabus is looked up/extracted once its pages are known
+                try:
+                    result = run_pipeline(
+                        io.BytesIO(content),
+                        analyze_paper=get_or_create_digest if mode == "thorough" else None,
+                        analyze_syllabus=get_or_extract_syllabus,
+                    )
+                except Exception as e:
+                    raise HTTPException(status_code=500, detail=f"PDF classification failed: {str(e)}")
+                papers = result["papers"] or [result["question_papers"]]
+                syllabus = result["syllabus_analysis"]
+                if syllabus is None and result["syllabus_analyzed"]:
+                    # The pipeline's extraction failed; don't repeat it serially here
+                    syllabus = (syllabus_fingerprint(result["syllabus"]), None)
+
+                # Predict next year's question paper
+                prediction = _predict_from_papers(
+                    papers, result["syllabus"],
+                    syllabus=syllabus,
+                    paper_analyses=result["paper_analyses"],
+                )
+        if isinstance(prediction, dict):
+            prediction = {**prediction, "mode": mode, "llm_calls": llm_calls.value}
+        return prediction
+    finally:
+        db.close()
+
+
+async def _read_unique_pdfs(files: List[UploadFile]) -> Dict[str, Tuple[str, bytes]]:
+    """Read a multi-file upload into {sha256: (filename, content)}, dropping duplicates (keeps upload order)."""
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_FILES} files can be uploaded at once.")
+
+    unique_files = {}
+    for file in files:
+        if not file.filename or not file.filename.lower().endswith(".pdf"):
+            raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
+        content = await file.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if digest not in unique_files:
+            unique_files[digest] = (file.filename, content)
+    return unique_files
+
+
+async def _run_file_pipelines(unique_files: Dict[str, Tuple[str, bytes]]) -> List[dict]:
+    """
+    Run the pipeline on each file as one paper, with cached per-paper digests,
+    sharing in-flight runs for files that other requests are already processing.
+    """
+    def process_file(digest: str, content: bytes):
+        # Each file is one paper, so its digest is also linked to the file's hash
+        analyze = partial(get_or_create_digest, upload_hash=digest)
+        return _run_in(file_pipeline_executor, run_pipeline, io.BytesIO(content), analyze_paper=analyze, split_papers=False)
+
+    try:
+        return await asyncio.gather(*(
+            upload_flight.do(f"pipeline:{digest}", partial(process_file, digest, content))
+            for digest, (_, content) in unique_files.items()
+        ))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PDF classification failed: {str(e)}")
+
+
+@router.post("/predict-question-paper", response_class=PlainTextResponse, dependencies=[Depends(ai_slot())])
+async def predict_question_paper(response: Response, current_user : User = Depends(get_current_user), file: UploadFile = File(...), db: Session = Depends(get_db),
+                                 mode: PredictionMode = Query("thorough", description="fast: sampled pages and local statistics, balanced: no per-paper analysis, thorough: full pipeline")):
     # 1. Save uploaded PDF
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
+    content = await file.read()
+    source_hash = hashlib.sha256(content).hexdigest()
     # timestamp = int(time.time())
     # safe_name = file.filename.replace(" ", "_")
     # pdf_path = os.path.join(UPLOAD_DIR, f"{timestamp}_{safe_name}")
     # with open(pdf_path, "wb") as f:
     #     f.write(await file.read())
     
-    # 2. Split into syllabus and question paper text
-    try:
-        classified = split_pdf_by_classification(file.file)
-        syllabus_text = classified["syllabus"]
-        question_paper_text = classified["question_papers"]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"PDF classification failed: {str(e)}")
-    
-    # 3. (Optional) Split question_paper_text into separate past papers (can be refined)
-    import re
-    papers = re.split(r"(20\d{2}-\d{2}|20\d{2}|May \d{4})", question_paper_text)
-    merged_papers = []
-    i = 0
-    while i < len(papers) - 1:
-        year = papers[i + 1].strip()
-        content = papers[i + 2].strip() if i + 2 < len(papers) else ''
-        merged_papers.append(f"{year}\n{content}")
-        i += 2
-    if not merged_papers:
-        merged_papers = [question_paper_text]
-    
-    # 4. Run syllabus analyzer (can be omitted if not used by predictor)
-    try:
-        syllabus_struct = extract_syllabus_with_llm(syllabus_text)
-    except Exception as e:
-        syllabus_struct = None  # fallback if extraction fails
-    
-    # 5. Predict next year's question paper (LLM-based synthesis)
-    try:
-        prediction = predict_next_paper_structure(
-            merged_papers,
-            syllabus_text=syllabus_text
-        )
-        if isinstance(prediction, dict) and prediction.get("predicted_question_paper"):
-            pred_text = prediction["predicted_question_paper"]
-        else:
-            pred_text = str(prediction)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+    # 2-5. Run the pipeline for the chosen mode and predict; concurrent uploads of the same PDF
+    #      await one shared run instead of starting their own
+    prediction = await upload_flight.do(
+        f"predict:{mode}:{source_hash}",
+        lambda: _run_in(ai_executor, _predict_upload, content, mode),
+    )
+    if isinstance(prediction, dict):
+        response.headers["X-Prediction-Mode"] = mode
+        response.headers["X-LLM-Calls"] = str(prediction.get("llm_calls", 0))
+    if isinstance(prediction, dict) and prediction.get("predicted_question_paper"):
+        pred_text = prediction["predicted_question_paper"]
+    else:
+        pred_text = str(prediction)
 
-    # 6. Save as JSON
-    # json_filename = f"predicted_{timestamp}.json"
-    # json_path = os.path.join(OUTPUTS_DIR, json_filename)
-    # try:
-    #     with open(json_path, "w", encoding="utf-8") as f:
-    #         json.dump(prediction, f, indent=2, ensure_ascii=False)
-    #     print(f"Prediction saved to {json_path}")
-    # except Exception as e:
-    #     print(f"Error saving prediction JSON: {e}")
+    # 6. Save to the prediction store so it can be fetched again later
+    await asyncio.to_thread(_store_prediction, db, current_user.id, prediction, source_hash, response)      #type: ignore
     
     # 7. Return only the predicted question paper as plain text
     return pred_text
+
+
+@router.post("/predict-question-papers", response_class=PlainTextResponse, dependencies=[Depends(ai_slot(HEAVY))])
+async def predict_question_papers(response: Response, current_user : User = Depends(get_current_user), files: List[UploadFile] = File(...), db: Session = Depends(get_db)):
+    """Predict from one PDF per paper; each file's boundaries are the paper boundaries."""
+    # 1. Read uploads and drop duplicates by content hash (keeps upload order)
+    unique_files = await _read_unique_pdfs(files)
+
+    # 2. Extract, classify and digest every file in parallel
+    results = await _run_file_pipelines(unique_files)
+
+    # 3. One paper per file; syllabus pages from any file are pooled
+    papers = []
+    paper_analyses = []
+    syllabus_parts = []
+    for result in results:
+        papers.extend(result["papers"])
+        paper_analyses.extend(result["paper_analyses"])
+        if result["syllabus"]:
+            syllabus_parts.append(result["syllabus"])
+    if not papers:
+        raise HTTPException(status_code=400, detail="No question paper pages found in the uploaded files.")
+    syllabus_text = "\n\n".join(syllabus_parts)
+
+    # 4. Single combined prediction over all papers
+    prediction = await _run_in(ai_executor, _predict_from_papers, papers, syllabus_text, paper_analyses=paper_analyses)
+    source_hash = hashlib.sha256("".join(sorted(unique_files)).encode()).hexdigest()
+    await asyncio.to_thread(_store_prediction, db, current_user.id, prediction, source_hash, response)      #type: ignore
+    if isinstance(prediction, dict) and prediction.get("predicted_question_paper"):
+        return prediction["predicted_question_paper"]
+    return str(prediction)
+
+
+@router.get("/predictions", response_model=List[PredictionSummary])
+async def get_predictions(current_user : User = Depends(get_current_user), db: Session = Depends(get_db),
+                          limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0)):
+    return list_predictions(db, current_user.id, limit=limit, offset=offset)      #type: ignore
+
+
+@router.get("/predictions/{prediction_id}")
+async def get_prediction_by_id(prediction_id: int, current_user : User = Depends(get_current_user), db: Session = Depends(get_db),
+                               if_none_match: str | None = Header(None), accept_encoding: str | None = Header(None)):
+    record = get_prediction(db, current_user.id, prediction_id)      #type: ignore
+    if not record:
+        raise HTTPException(status_code=404, detail="Prediction not found")
+
+    # The ETag depends on the content-coding, so the coding is chosen first
+    encoding = choose_encoding(accept_encoding)
+    headers = {
+        "ETag": representation_etag(record.etag, encoding),      #type: ignore
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(if_none_match, record.etag):      #type: ignore
+        return Response(status_code=304, headers=headers)
+
+    try:
+        body = await asyncio.to_thread(read_prediction_body, record, encoding)
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail="Prediction data is no longer available")
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.post("/compare-question-papers", dependencies=[Depends(ai_slot(HEAVY))])
+async def compare_question_papers(current_user : User = Depends(get_current_user), files: List[UploadFile] = File(...)):
+    """Year-over-year comparison of one PDF per paper, built from cached per-paper digests."""
+    unique_files = await _read_unique_pdfs(files)
+
+    with count_llm_calls() as llm_calls:
+        # Files uploaded before are answered from their cached digest without being
+        # extracted or classified again; only new files go through the pipeline
+        cached = await asyncio.to_thread(find_upload_digests, list(unique_files))
+        new_files = {digest: file for digest, file in unique_files.items() if digest not in cached}
+        results = dict(zip(new_files, await _run_file_pipelines(new_files)))
+
+        papers = []
+        for digest, (filename, _) in unique_files.items():
+            if digest in cached:
+                paper_digest = cached[digest]
+            else:
+                result = results[digest]
+                paper_digest = result["paper_analyses"][0] if result["papers"] else None
+            if is_valid_digest(paper_digest):
+                papers.append((filename, paper_digest))
+        if len(papers) < 2:
+            raise HTTPException(status_code=400, detail="At least 2 question papers are required for comparison.")
+
+        # Oldest first when every paper has a year, upload order otherwise
+        if all(digest.get("year") for _, digest in papers):
+            papers.sort(key=lambda item: item[1]["year"])
+
+        # Trends are plain set/array operations over the digests; the LLM only narrates them
+        engine = ComparisonEngine()
+        for filename, digest in papers:
+            engine.add(digest, str(digest["year"]) if digest.get("year") else filename)
+        trends = engine.trends()
+        summary = await _run_in(ai_executor, narrate_trends, trends)
+
+    return {
+        "timeline": engine.timeline,
+        "trends": trends,
+        "summary": summary,
+        "paper_count": len(papers),
+        "llm_calls": llm_calls.value,
+    }
+
+
+@router.get("/stats")
+async def get_stats(current_user : User = Depends(get_current_user)):
+    return {
+        "admission": admission.stats(),
+        "llm": llm_stats(),
+        "coalescing": {"llm_calls": llm_flight.stats(), "uploads": upload_flight.stats()},
+        "page_classifier": classifier_stats(),
+    }
@@ -0,0 +1,162 @@
+import asyncio
+import math
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict
+
+LIGHT = "light"
+HEAVY = "heavy"
+LANES = (LIGHT, HEAVY)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Global concurrency limiter with a bounded wait queue, per-user quotas and
+    two priority lanes.
+
+    Light requests (small uploads) can use every slot and are always served
+    before waiting heavy ones; heavy requests may never occupy the slots
+    reserved for the light lane. All state lives on the event loop, so no
+    locking is needed.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float,
+                 light_reserved: int = 1, per_user_concurrency: int = 2,
+                 per_user_per_hour: int = 0, window_seconds: float = 3600.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.heavy_limit = max(1, self.max_concurrency - max(0, light_reserved))
+        self.per_user_concurrency = per_user_concurrency
+        self.per_user_per_hour = per_user_per_hour
+        self.window_seconds = window_seconds
+
+        self._active = {LIGHT: 0, HEAVY: 0}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._user_inflight: Dict[int, int] = defaultdict(int)
+        self._user_history: Dict[int, Deque[float]] = defaultdict(deque)
+        self._service_time = 10.0  # EWMA of seconds per request, seeded pessimistically
+        self._counters = {"admitted": 0, "queued": 0, "rejected_queue_full": 0,
+                          "rejected_timeout": 0, "rejected_user_quota": 0}
+
+    @property
+    def active(self) -> int:
+        return self._active[LIGHT] + self._active[HEAVY]
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters[LIGHT]) + len(self._waiters[HEAVY])
+
+    def _can_start(self, lane: str) -> bool:
+        if self.active >= self.max_concurrency:
+            return False
+        if lane == HEAVY:
+            return self._active[HEAVY] < self.heavy_limit and not self._waiters[LIGHT]
+        return True
+
+    def _retry_after(self, ahead: int) -> int:
+        return max(1, math.ceil(self._service_time * (ahead + 1) / self.max_concurrency))
+
+    def _check_user_quota(self, user_id: int):
+        if self._user_inflight[user_id] >= self.per_user_concurrency:
+            self._counters["rejected_user_quota"] += 1
+            raise AdmissionRejected("Too many concurrent requests for this user", self._retry_after(0))
+
+        if self.per_user_per_hour:
+            history = self._user_history[user_id]
+            now = time.monotonic()
+            while history and now - history[0] > self.window_seconds:
+                history.popleft()
+            if len(history) >= self.per_user_per_hour:
+                self._counters["rejected_user_quota"] += 1
+                retry = math.ceil(self.window_seconds - (now - history[0]))
+                raise AdmissionRejected("Hourly request quota exceeded", max(1, retry))
+
+    def _dispatch(self):
+        # Hand freed slots to waiters, light lane first
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters and self._can_start_waiter(lane):
+                future = waiters.popleft()
+                if future.done():
+                    continue
+                self._active[lane] += 1
+                future.set_result(None)
+
+    def _can_start_waiter(self, lane: str) -> bool:
+        if self.active >= self.max_concurrency:
+            return False
+        return lane == LIGHT or self._active[HEAVY] < self.heavy_limit
+
+    async def _acquire(self, lane: str):
+        if not self._waiters[lane] and self._can_start(lane):
+            self._active[lane] += 1
+            return
+
+        if self.waiting >= self.max_queue:
+            self._counters["rejected_queue_full"] += 1
+            raise AdmissionRejected("Server is busy, please retry later", self._retry_after(self.waiting))
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(future)
+        self._counters["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was granted just as we gave up; pass it on
+                self._release(lane)
+            else:
+                future.cancel()
+                try:
+                    self._waiters[lane].remove(future)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._counters["rejected_timeout"] += 1
+            raise AdmissionRejected("Timed out waiting for a free slot", self._retry_after(self.waiting))
+
+    def _release(self, lane: str):
+        self._active[lane] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, user_id: int, lane: str = LIGHT):
+        """Hold one slot for the duration of the block or raise AdmissionRejected."""
+        self._check_user_quota(user_id)
+        self._user_inflight[user_id] += 1
+        try:
+            await self._acquire(lane)
+            self._counters["admitted"] += 1
+            if self.per_user_per_hour:
+                self._user_history[user_id].append(time.monotonic())
+            started = time.monotonic()
+            try:
+                yield
+            finally:
+                elapsed = time.monotonic() - started
+                self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+                self._release(lane)
+        finally:
+            self._user_inflight[user_id] -= 1
+            if not self._user_inflight[user_id]:
+                del self._user_inflight[user_id]
+
+    def stats(self) -> dict:
+        return {
+            "active": dict(self._active),
+            "waiting": {lane: len(w) for lane, w in self._waiters.items()},
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "avg_service_seconds": round(self._service_time, 3),
+            **self._counters,
+        }
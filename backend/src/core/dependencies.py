@@ -1,6 +1,9 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from typing import Annotated
+from typing import Annotated, Optional
+from config import (AI_MAX_CONCURRENCY, AI_MAX_QUEUE, AI_QUEUE_TIMEOUT_SECONDS, AI_LIGHT_RESERVED_SLOTS,
+                    AI_PER_USER_CONCURRENCY, AI_PER_USER_REQUESTS_PER_HOUR, AI_HEAVY_UPLOAD_BYTES)
+from src.core.admission import AdmissionController, AdmissionRejected, HEAVY, LIGHT
 from src.utils.jwt_util import decode_access_token
 from src.db.db import get_db
 from src.models.user import User
@@ -31,4 +34,37 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db=Dep
             detail=str(e),
             headers={"WWW-Authenticate": "Bearer"},
         )
-       
\ No newline at end of file
+       
+
+admission = AdmissionController(
+    max_concurrency=AI_MAX_CONCURRENCY,
+    max_queue=AI_MAX_QUEUE,
+    queue_timeout=AI_QUEUE_TIMEOUT_SECONDS,
+    light_reserved=AI_LIGHT_RESERVED_SLOTS,
+    per_user_concurrency=AI_PER_USER_CONCURRENCY,
+    per_user_per_hour=AI_PER_USER_REQUESTS_PER_HOUR,
+)
+
+def ai_slot(lane: Optional[str] = None):
+    """
+    Dependency factory that admits a request into the AI worker pool.
+    Without an explicit lane, fast-mode requests and uploads up to
+    AI_HEAVY_UPLOAD_BYTES go to the light lane and everything else to the
+    heavy lane.
+    """
+    async def dependency(request: Request, current_user: User = Depends(get_current_user)):
+        request_lane = lane
+        if request_lane is None:
+            size = int(request.headers.get("content-length") or 0)
+            fast = request.query_params.get("mode") == "fast"
+            request_lane = HEAVY if size > AI_HEAVY_UPLOAD_BYTES and not fast else LIGHT
+        try:
+            async with admission.slot(current_user.id, request_lane):      #type: ignore
+                yield
+        except AdmissionRejected as e:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=e.detail,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+    return dependency
@@ -0,0 +1,80 @@
+import hashlib
+from typing import Any, Dict, List, Optional
+import orjson
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.agents.paper_comparison import digest_paper, is_valid_digest
+from src.agents.syllabus_index import normalize_syllabus_text
+from src.db.db import SessionLocal
+from src.models.paper_digest import PaperDigest, PaperUpload
+
+
+def paper_fingerprint(paper_text: str) -> str:
+    return hashlib.sha256(normalize_syllabus_text(paper_text).encode("utf-8")).hexdigest()
+
+
+def _link_upload(db: Session, upload_hash: str, fingerprint: str):
+    if db.query(PaperUpload.id).filter(PaperUpload.upload_hash == upload_hash).first():
+        return
+    try:
+        db.add(PaperUpload(upload_hash=upload_hash, fingerprint=fingerprint))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+
+
+def get_or_create_digest(paper_text: str, upload_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Return the cached digest of a paper, computing and storing it on a miss.
+    With `upload_hash` (sha256 of a one-paper PDF) the file is linked to the
+    digest, so the next upload of the same file skips extraction entirely.
+    Called from pipeline worker threads, so it uses its own short-lived session.
+    """
+    fingerprint = paper_fingerprint(paper_text)
+    db = SessionLocal()
+    try:
+        record = db.query(PaperDigest).filter(PaperDigest.fingerprint == fingerprint).first()
+        if record:
+            cached = orjson.loads(record.digest)      #type: ignore
+            if is_valid_digest(cached):
+                if upload_hash:
+                    _link_upload(db, upload_hash, fingerprint)
+                return cached
+
+        digest = digest_paper(paper_text)
+        if digest["source"] != "llm" or not is_valid_digest(digest):
+            # Local-only fallbacks are not cached so a later call can do better
+            return digest
+        try:
+            if record:
+                # Replace a malformed entry stored before digests were validated
+                record.digest = orjson.dumps(digest).decode("utf-8")      #type: ignore
+            else:
+                db.add(PaperDigest(fingerprint=fingerprint, digest=orjson.dumps(digest).decode("utf-8")))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+        if upload_hash:
+            _link_upload(db, upload_hash, fingerprint)
+        return digest
+    finally:
+        db.close()
+
+
+def find_upload_digests(upload_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Cached digests of previously uploaded one-paper PDFs, by file sha256; no extraction or LLM call."""
+    if not upload_hashes:
+        return {}
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(PaperUpload.upload_hash, PaperDigest.digest)
+            .join(PaperDigest, PaperDigest.fingerprint == PaperUpload.fingerprint)
+            .filter(PaperUpload.upload_hash.in_(upload_hashes))
+            .all()
+        )
+        digests = {upload_hash: orjson.loads(digest) for upload_hash, digest in rows}
+        return {upload_hash: digest for upload_hash, digest in digests.items() if is_valid_digest(digest)}
+    finally:
+        db.close()
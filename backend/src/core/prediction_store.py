@@ -0,0 +1,121 @@
+import hashlib
+import os
+import tempfile
+from typing import List, Optional
+from sqlalchemy.orm import Session
+
+from src.models.prediction import Prediction
+from src.utils.encoding import dumps_json, gzip_compress, gzip_decompress, brotli_compress
+
+OUTPUTS_DIR = "outputs"
+os.makedirs(OUTPUTS_DIR, exist_ok=True)
+
+
+def _blob_path(digest: str, suffix: str) -> str:
+    return os.path.join(OUTPUTS_DIR, f"{digest}.json.{suffix}")
+
+
+def _write_atomic(path: str, data: bytes):
+    # Unique temp file per writer: concurrent first requests for the same blob
+    # must not rename each other's temp file away
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def save_prediction(db: Session, user_id: int, prediction: dict, source_hash: Optional[str] = None) -> Prediction:
+    """Persist a prediction as a gzip blob on disk plus a metadata row."""
+    raw = dumps_json(prediction)
+    digest = hashlib.sha256(raw).hexdigest()
+
+    # Blobs are content-addressed, so identical predictions share one file
+    path = _blob_path(digest, "gz")
+    if not os.path.exists(path):
+        _write_atomic(path, gzip_compress(raw))
+
+    record = Prediction(
+        user_id=user_id,
+        source_hash=source_hash,
+        etag=f'"{digest}"',
+        blob_path=path,
+        raw_size=len(raw),
+        stored_size=os.path.getsize(path),
+        input_papers=prediction.get("input_papers"),
+        has_syllabus=bool(prediction.get("has_syllabus")),
+    )
+    db.add(record)
+    db.commit()
+    db.refresh(record)
+    return record
+
+
+def list_predictions(db: Session, user_id: int, limit: int = 20, offset: int = 0) -> List[Prediction]:
+    return (
+        db.query(Prediction)
+        .filter(Prediction.user_id == user_id)
+        .order_by(Prediction.created_at.desc(), Prediction.id.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+
+def get_prediction(db: Session, user_id: int, prediction_id: int) -> Optional[Prediction]:
+    return (
+        db.query(Prediction)
+        .filter(Prediction.id == prediction_id, Prediction.user_id == user_id)
+        .first()
+    )
+
+
+def read_prediction_body(record: Prediction, encoding: str) -> bytes:
+    """Return the stored JSON in the requested content encoding."""
+    with open(record.blob_path, "rb") as f:
+        gz = f.read()
+    if encoding == "gzip":
+        return gz
+    if encoding == "br":
+        # Brotli copies are produced on first request and kept next to the gzip blob
+        br_path = record.blob_path[:-len("gz")] + "br"
+        if os.path.exists(br_path):
+            with open(br_path, "rb") as f:
+                return f.read()
+        body = brotli_compress(gzip_decompress(gz))
+        _write_atomic(br_path, body)
+        return body
+    return gzip_decompress(gz)
+
+
+def representation_etag(etag: str, encoding: str) -> str:
+    """
+    Strong ETag of one content-coding of a stored prediction: RFC 9110 requires
+    strong validators to differ between codings, so "<sha>" becomes "<sha>-br" etc.
+    """
+    if encoding == "identity":
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _etag_base(tag: str) -> str:
+    tag = tag.strip().removeprefix("W/")
+    if tag.endswith('"') and "-" in tag:
+        tag = tag[:tag.rindex("-")] + '"'
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match; any coding of the
+    # same stored JSON matches, since they all decode to the same content
+    return any(_etag_base(tag) == _etag_base(etag) for tag in if_none_match.split(","))
@@ -0,0 +1,57 @@
+from typing import Optional, Tuple
+import orjson
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.agents.syllabus_analyzer import extract_syllabus_with_llm
+from src.agents.syllabus_index import syllabus_fingerprint
+from src.db.db import SessionLocal
+from src.models.syllabus import Syllabus
+
+
+def find_syllabus(db: Session, syllabus_text: str) -> Tuple[Optional[str], Optional[dict]]:
+    """Look up an already extracted syllabus without calling the LLM."""
+    if not syllabus_text or not syllabus_text.strip():
+        return None, None
+    fingerprint = syllabus_fingerprint(syllabus_text)
+    record = db.query(Syllabus).filter(Syllabus.fingerprint == fingerprint).first()
+    return fingerprint, (orjson.loads(record.structure) if record else None)      #type: ignore
+
+
+def get_or_extract_syllabus(syllabus_text: str) -> Tuple[Optional[str], Optional[dict]]:
+    """
+    Return (fingerprint, structured syllabus), reusing a stored extraction of
+    the same syllabus text from any user before calling the LLM.
+    Called from pipeline worker threads, so it uses its own short-lived session.
+    """
+    if not syllabus_text or not syllabus_text.strip():
+        return None, None
+
+    fingerprint = syllabus_fingerprint(syllabus_text)
+    db = SessionLocal()
+    try:
+        record = db.query(Syllabus).filter(Syllabus.fingerprint == fingerprint).first()
+        if record:
+            record.hits = (record.hits or 0) + 1      #type: ignore
+            db.commit()
+            return fingerprint, orjson.loads(record.structure)      #type: ignore
+
+        structure = extract_syllabus_with_llm(syllabus_text)
+        if not structure:
+            # Failed extractions are not cached so the next upload retries
+            return fingerprint, None
+
+        try:
+            db.add(Syllabus(
+                fingerprint=fingerprint,
+                course_title=str(structure.get("course_title") or "")[:255] or None,
+                structure=orjson.dumps(structure).decode("utf-8"),
+                hits=0,
+            ))
+            db.commit()
+        except IntegrityError:
+            # Another request stored the same syllabus first
+            db.rollback()
+        return fingerprint, structure
+    finally:
+        db.close()
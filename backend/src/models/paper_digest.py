@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP
+from src.db.db import Base
+from datetime import datetime
+
+class PaperDigest(Base):
+    __tablename__ = "paper_digests"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fingerprint = Column(String, unique=True, index=True, nullable=False)
+    digest = Column(Text, nullable=False)
+
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+
+    def __repr__(self):
+        return f"<PaperDigest(id={self.id}, fingerprint={self.fingerprint})>"
+
+
+class PaperUpload(Base):
+    """Maps an uploaded one-paper PDF (by file sha256) to its paper digest."""
+    __tablename__ = "paper_uploads"
+
+    id = Column(Integer, primary_key=True, index=True)
+    upload_hash = Column(String, unique=True, index=True, nullable=False)
+    fingerprint = Column(String, index=True, nullable=False)
+
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+
+    def __repr__(self):
+        return f"<PaperUpload(id={self.id}, upload_hash={self.upload_hash})>"
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP, ForeignKey
+from src.db.db import Base
+from datetime import datetime
+
+class Prediction(Base):
+    __tablename__ = "predictions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    source_hash = Column(String, index=True)
+    etag = Column(String, nullable=False)
+    blob_path = Column(String, nullable=False)
+    raw_size = Column(Integer)
+    stored_size = Column(Integer)
+    input_papers = Column(Integer)
+    has_syllabus = Column(Boolean, default=False)
+
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+
+    def __repr__(self):
+        return f"<Prediction(id={self.id}, user_id={self.user_id}, etag={self.etag})>"
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP
+from src.db.db import Base
+from datetime import datetime
+
+class Syllabus(Base):
+    __tablename__ = "syllabi"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fingerprint = Column(String, unique=True, index=True, nullable=False)
+    course_title = Column(String)
+    structure = Column(Text, nullable=False)
+    hits = Column(Integer, default=0)
+
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+
+
+    def __repr__(self):
+        return f"<Syllabus(id={self.id}, course_title={self.course_title})>"
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional
+from datetime import datetime
+
+class PredictionSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description="Prediction ID")
+    etag: str = Field(..., description="Entity tag of the stored prediction JSON")
+    input_papers: Optional[int] = Field(None, description="Number of question papers used")
+    has_syllabus: bool = Field(False, description="Whether a syllabus was used")
+    raw_size: Optional[int] = Field(None, description="Size of the JSON payload in bytes")
+    stored_size: Optional[int] = Field(None, description="Size of the compressed blob in bytes")
+    created_at: Optional[datetime] = Field(None, description="When the prediction was made")
@@ -0,0 +1,45 @@
+import gzip
+import orjson
+import brotli
+
+def dumps_json(data) -> bytes:
+    # orjson is several times faster than json for the large raw_output payloads
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+def gzip_compress(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+def gzip_decompress(data: bytes) -> bytes:
+    return gzip.decompress(data)
+
+def brotli_compress(data: bytes) -> bytes:
+    return brotli.compress(data, quality=5)
+
+def parse_accept_encoding(header: str | None) -> dict:
+    """Parse an Accept-Encoding header into {coding: q-value}."""
+    codings = {}
+    for part in (header or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        coding, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[coding.strip().lower()] = q
+    return codings
+
+def choose_encoding(header: str | None) -> str:
+    """Pick 'br', 'gzip' or 'identity' for the client's Accept-Encoding."""
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get("*", 0.0)
+    best, best_q = "identity", 0.0
+    for coding in ("br", "gzip"):
+        q = codings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Thread-safe duplicate call suppression.
+
+    While a call for `key` is running, other threads asking for the same key
+    wait for it and share its result (or exception) instead of running the
+    function again. Nothing is cached once the call has finished.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._counters = {"calls": 0, "executed": 0, "coalesced": 0, "errors": 0}
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self._lock:
+            self._counters["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self._counters["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._counters["executed"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._counters["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counters, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    Duplicate call suppression for coroutines on one event loop.
+
+    The shared computation runs as its own task, so a waiter that is cancelled
+    (e.g. the client disconnected) does not cancel it for the others. Once
+    every waiter has gone away the work is "abandoned": by default it keeps
+    running and stays joinable, because work handed to a thread (e.g.
+    asyncio.to_thread) cannot be stopped by cancelling its task. With
+    `cancel_abandoned=True` (pure coroutine work) the task is cancelled and
+    its key released at once, so the next caller starts a fresh run instead
+    of joining a cancelled one.
+    """
+
+    def __init__(self, cancel_abandoned: bool = False):
+        self.cancel_abandoned = cancel_abandoned
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._counters = {"calls": 0, "executed": 0, "coalesced": 0, "abandoned": 0, "cancelled": 0, "errors": 0}
+
+    def _release(self, key: str, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            del self._waiters[key]
+
+    def _finished(self, key: str, task: asyncio.Task):
+        self._release(key, task)
+        if task.cancelled():
+            self._counters["cancelled"] += 1
+        elif task.exception() is not None:
+            self._counters["errors"] += 1
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self._counters["calls"] += 1
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            self._waiters[key] = 0
+            self._counters["executed"] += 1
+            task.add_done_callback(lambda t: self._finished(key, t))
+        else:
+            self._counters["coalesced"] += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._tasks.get(key) is task and not task.done():
+                self._waiters[key] -= 1
+                if not self._waiters[key]:
+                    self._counters["abandoned"] += 1
+                    if self.cancel_abandoned:
+                        # Nobody may join a task that is being cancelled
+                        self._release(key, task)
+                        task.cancel()
+            raise
+
+    def stats(self) -> dict:
+        return {**self._counters, "in_flight": len(self._tasks)}